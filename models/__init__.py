@@ -1,2 +1,14 @@
-from .image_model import ImageModel
-from .background_removal_model import BackgroundRemovalWorker
\ No newline at end of file
+from .image_model import ImageModel, ImageState, ResultQuality
+from .background_removal_model import BackgroundRemovalWorker
+from .session_manager import SessionManager, session_manager
+from .removal_engine import RemovalEngine, EngineConfig
+from .result_cache import ResultCache
+from .result_store import ResultStore, ResultHandle
+from .cancellation import CancellationToken, Cancelled
+from .export_engine import ExportWorker, ExportOptions, ExportFormat, ConflictPolicy
+from .metrics import ImageMetrics, MetricsTrace, ThroughputMeter
+from .model_registry import ModelRegistry, ModelInfo, ModelWarmupWorker, model_registry, PREVIEW_MODEL
+from .image_registry import ImageRegistry
+from .folder_scanner import FolderScanner
+from .thumbnail_cache import ThumbnailCache
+from .update_bridge import UpdateBridge, UpdateBatch
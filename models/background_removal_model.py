@@ -1,58 +1,178 @@
-import io
+import threading
 
 from PySide6.QtCore import QObject, Signal, QThread
 from PySide6.QtGui import QImage
-import rembg
 from PIL import Image
-from .image_model import ImageModel
+from utils.image_utils import apply_mask, pil_to_qimage
+from .cancellation import CancellationToken
+from .image_model import ImageModel, ResultQuality
+from .metrics import ImageMetrics, MetricsTrace
+from .removal_engine import RemovalEngine, EngineConfig
+from .result_store import ResultStore
+from .scheduler import PriorityScheduler
+from .session_manager import DEFAULT_MODEL
+from .thumbnail_service import load_thumbnail
+
+RESULT_THUMBNAIL_SIZE = 128
 
 class BackgroundRemovalWorker(QThread):
-    """Worker thread for background removal processing"""
+    """Worker thread that drives the parallel background removal engine
+
+    Images are taken from ``scheduler``, so selected and visible images can
+    jump the queue while the run is going. For every image, as it finishes,
+    either ``image_processed`` or ``error_occurred`` is emitted, followed by
+    ``progress``. ``all_finished`` is always emitted last, right after
+    ``stage_stats``.
+
+    With ``config.preview_model`` set, every image first goes through a
+    quick pass with that model at low resolution, and ``image_processed``
+    is emitted twice: once with ``ResultQuality.PREVIEW``, then again with
+    ``ResultQuality.FULL`` when the full-quality pass replaces it. Images
+    are picked by the same scheduler in both passes.
+
+    ``stop`` and ``cancel_image`` return immediately; in-flight inference is
+    aborted and the thread winds down on its own, so callers never need to
+    ``wait()`` on the GUI thread. If any image was left unfinished,
+    ``cancelled`` lists their paths before ``stage_stats``.
+
+    Each result is an ``L`` alpha mask kept in ``store``; only its handle
+    and a small composed thumbnail are sent to the GUI thread.
+
+    Every image, whatever its outcome, also gets an ``image_metrics`` dict
+    with its stage timings and sizes; with ``trace_path`` they are appended
+    to that file as JSON lines. ``bottleneck`` names the stage that limits
+    the run so far.
+    """
     progress = Signal(int)
-    image_processed = Signal(str, QImage)  # image_path, processed_image
+    image_processed = Signal(str, object, QImage, object)  # image_path, ResultHandle, thumbnail, ResultQuality
     all_finished = Signal()
     error_occurred = Signal(str, str)  # image_path, error_message
+    cancelled = Signal(list)  # paths of images that were not finished
+    stage_stats = Signal(dict)  # stage name -> throughput counters
+    image_metrics = Signal(dict)  # ImageMetrics.to_dict() for one image
     
-    def __init__(self, image_models: list[ImageModel] | list[str]):
+    def __init__(self, image_models: list[ImageModel] | list[str], model_name: str = DEFAULT_MODEL,
+                 config: EngineConfig | None = None, store: ResultStore | None = None,
+                 thumbnail_size: int = RESULT_THUMBNAIL_SIZE, trace_path: str | None = None):
         super().__init__()
         if isinstance(image_models, list) and isinstance(image_models[0], str):
             image_models = [ImageModel(path) for path in image_models]
         self.image_models = image_models
-        self.running = True
+        self.config = config or EngineConfig(model_name=model_name)
+        self.engine = RemovalEngine(self.config)
+        self.preview_engine = RemovalEngine(self.config.preview()) if self.config.preview_model else None
+        self.passes = 2 if self.preview_engine is not None else 1
+        self._running_engine = self.engine  # engine of the pass being run
+        self.store = store or ResultStore()
+        self.thumbnail_size = thumbnail_size
+        self.trace_path = trace_path
+        self.scheduler = PriorityScheduler(image_model.path for image_model in self.image_models)
+        self.token = CancellationToken()
+        self._undelivered = {}  # path -> handle stored but not yet emitted
+        self._undelivered_lock = threading.Lock()
         
     def run(self):
-        total = len(self.image_models)
-        for i, image_model in enumerate(self.image_models):
-            if not self.running:
-                break
-                
-            try:
-                # Load image
-                input_image = Image.open(image_model.path)
-                
-                # Remove background
-                output = rembg.remove(input_image)
-                
-                # Convert to QImage
-                byte_array = io.BytesIO()
-                output.save(byte_array, format='PNG')
-                byte_array = byte_array.getvalue()
-                
-                q_image = QImage.fromData(byte_array)
-                
-                # Emit signal with processed image
-                self.image_processed.emit(image_model.path, q_image)
-                
-                # Update progress
-                self.progress.emit(int((i + 1) / total * 100))
-                
-            except Exception as e:
-                self.error_occurred.emit(image_model.path, str(e))
-                
+        paths = [image_model.path for image_model in self.image_models]
+        passes = [(self.engine, ResultQuality.FULL)]
+        if self.preview_engine is not None:
+            passes.insert(0, (self.preview_engine, ResultQuality.PREVIEW))
+        steps = len(paths) * len(passes)
+        finished = set()  # paths with a final outcome: a full result or an error
+        reported = 0
+        
+        def report_progress(count=1):
+            nonlocal reported
+            reported += count
+            self.progress.emit(int(reported / steps * 100))
+            
+        trace = MetricsTrace(self.trace_path) if self.trace_path else None
+        
+        def on_metrics(metrics: ImageMetrics):
+            if trace is not None:
+                trace.write(metrics)
+            self.image_metrics.emit(metrics.to_dict())
+        
+        try:
+            for number, (engine, quality) in enumerate(passes):
+                self._running_engine = engine
+                # Images that fail or are cancelled skip the passes after this one
+                skipped_steps = len(passes) - number
+                if number:
+                    if self.token.is_cancelled():
+                        break
+                    self.scheduler.requeue(path for path in paths
+                                           if path not in finished and not self.token.is_cancelled(path))
+                    
+                def on_result(index, path, result):
+                    handle, thumbnail = result
+                    with self._undelivered_lock:
+                        self._undelivered.pop(path, None)
+                    if quality == ResultQuality.FULL:
+                        finished.add(path)
+                    self.image_processed.emit(path, handle, thumbnail, quality)
+                    report_progress()
+                    
+                def on_error(index, path, message):
+                    finished.add(path)
+                    self.error_occurred.emit(path, message)
+                    report_progress(skipped_steps)
+                    
+                def on_cancelled(index, path):
+                    report_progress(skipped_steps)
+                    
+                engine.run(
+                    self.scheduler,
+                    finalize=self._store_result,
+                    on_result=on_result,
+                    on_error=on_error,
+                    token=self.token,
+                    on_cancelled=on_cancelled,
+                    ordered=False,
+                    on_metrics=on_metrics,
+                )
+        finally:
+            if trace is not None:
+                trace.close()
+        
+        # Results stored after a stop were never handed out
+        with self._undelivered_lock:
+            for handle in self._undelivered.values():
+                self.store.release(handle)
+            self._undelivered.clear()
+        unfinished = [path for path in paths if path not in finished]
+        if unfinished:
+            self.cancelled.emit(unfinished)
+        self.stage_stats.emit(self.engine.stage_stats())
         self.all_finished.emit()
         
+    def bottleneck(self) -> str | None:
+        """The pipeline stage limiting the pass being run; callable from any thread"""
+        return self._running_engine.bottleneck()
+
     def stop(self):
-        self.running = False
+        """Cancel the run without waiting for it to finish"""
+        self.token.cancel()
+        
+    def cancel_image(self, path: str):
+        """Drop one image from the run; the others carry on"""
+        self.token.cancel_item(path)
+
+    def _store_result(self, path: str, mask: Image.Image, image: Image.Image | None, proxied: bool):
+        """Store the mask and compose its thumbnail on the pool thread
+
+        The thumbnail is scaled from the image inference ran on, even a
+        reduced proxy, so the source is only decoded again on a cache hit.
+        """
+        if image is None:
+            thumbnail = load_thumbnail(path, self.thumbnail_size)
+        else:
+            thumbnail = image.copy()
+            thumbnail.thumbnail((self.thumbnail_size, self.thumbnail_size), Image.Resampling.LANCZOS)
+        thumbnail = apply_mask(thumbnail, mask.resize(thumbnail.size, Image.Resampling.BILINEAR))
+        handle = self.store.put(mask)
+        with self._undelivered_lock:
+            self._undelivered[path] = handle
+        return handle, pil_to_qimage(thumbnail)
 
 # class BackgroundRemovalModel(QObject):
 #     """Model for handling background removal operations"""
@@ -0,0 +1,87 @@
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+import rembg
+from PIL import Image
+
+# Preprocessing used by rembg's own predict() for single-output models
+# model name -> (mean, std, input size)
+BATCHABLE_MODELS: Dict[str, Tuple[Tuple[float, float, float], Tuple[float, float, float], Tuple[int, int]]] = {
+    'u2net': ((0.485, 0.456, 0.406), (0.229, 0.224, 0.225), (320, 320)),
+    'u2netp': ((0.485, 0.456, 0.406), (0.229, 0.224, 0.225), (320, 320)),
+    'u2net_human_seg': ((0.485, 0.456, 0.406), (0.229, 0.224, 0.225), (320, 320)),
+    'silueta': ((0.485, 0.456, 0.406), (0.229, 0.224, 0.225), (320, 320)),
+    'isnet-general-use': ((0.5, 0.5, 0.5), (1.0, 1.0, 1.0), (1024, 1024)),
+}
+
+
+def supports_batching(session) -> bool:
+    """Check if a rembg session can run more than one image per forward pass"""
+    if session.model_name not in BATCHABLE_MODELS:
+        return False
+    batch_dim = session.inner_session.get_inputs()[0].shape[0]
+    # Symbolic or missing dimensions are dynamic; a fixed integer is not
+    return not isinstance(batch_dim, int)
+
+
+def predict_masks(session, images: List[Image.Image], run_options=None) -> List[Image.Image]:
+    """Run one session call for all ``images`` and return a mask per image
+
+    Each image is resized and normalized exactly as rembg does for a single
+    image, stacked into one NCHW tensor, and the predicted masks are split
+    and scaled back to their source sizes. ``run_options`` is an
+    ``onnxruntime.RunOptions`` whose ``terminate`` flag aborts the call.
+    """
+    mean, std, size = BATCHABLE_MODELS[session.model_name]
+    input_name = session.inner_session.get_inputs()[0].name
+    tensor = np.concatenate(
+        [session.normalize(image, mean, std, size)[input_name] for image in images], axis=0)
+
+    preds = session.inner_session.run(None, {input_name: tensor}, run_options)[0][:, 0, :, :]
+
+    masks = []
+    for pred, image in zip(preds, images):
+        ma = np.max(pred)
+        mi = np.min(pred)
+        pred = (pred - mi) / (ma - mi)
+        mask = Image.fromarray((pred.clip(0, 1) * 255).astype("uint8"), mode="L")
+        masks.append(mask.resize(image.size, Image.Resampling.LANCZOS))
+    return masks
+
+
+
+class _RunOptionsSession:
+    """Wraps a session's ``inner_session`` so rembg's own ``run`` calls use this thread's RunOptions
+
+    rembg's predict() calls ``inner_session.run(None, feeds)`` without run
+    options; the wrapper adds the ones set by the calling thread, so other
+    threads sharing the session are unaffected.
+    """
+
+    def __init__(self, inner):
+        self._inner = inner
+        self._local = threading.local()
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    def run(self, output_names, input_feed, run_options=None):
+        return self._inner.run(output_names, input_feed,
+                               run_options or getattr(self._local, 'run_options', None))
+
+
+_wrap_lock = threading.Lock()
+
+
+def remove_mask(session, image: Image.Image, run_options=None) -> Image.Image:
+    """``rembg.remove(image, only_mask=True)`` for any model, abortable through ``run_options``"""
+    with _wrap_lock:
+        if not isinstance(session.inner_session, _RunOptionsSession):
+            session.inner_session = _RunOptionsSession(session.inner_session)
+        inner = session.inner_session
+    inner._local.run_options = run_options
+    try:
+        return rembg.remove(image, session=session, only_mask=True)
+    finally:
+        inner._local.run_options = None
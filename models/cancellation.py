@@ -0,0 +1,76 @@
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+
+class Cancelled(Exception):
+    """Raised inside a stage when its work has been cancelled"""
+
+
+class CancellationToken:
+    """Cooperative cancellation for a run, or for single items within it
+
+    Work checks the token between steps with ``raise_if_cancelled``. Steps
+    that block in native code, such as an ONNX inference call, register a
+    callback with ``on_cancel`` that interrupts them. ``cancel`` stops
+    everything; ``cancel_item`` stops only the work registered for that key.
+    Safe to use from any thread.
+    """
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._items: Set[Hashable] = set()
+        self._callbacks: Dict[int, Tuple[Optional[frozenset], Callable[[], None]]] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """Cancel the whole run"""
+        with self._lock:
+            self._cancelled.set()
+            callbacks = [callback for _, callback in self._callbacks.values()]
+        for callback in callbacks:
+            callback()
+
+    def cancel_item(self, key: Hashable):
+        """Cancel one item without stopping the rest of the run"""
+        with self._lock:
+            self._items.add(key)
+            callbacks = [callback for keys, callback in self._callbacks.values()
+                         if keys is not None and key in keys and keys <= self._items]
+        for callback in callbacks:
+            callback()
+
+    def is_cancelled(self, key: Optional[Hashable] = None) -> bool:
+        """Check the whole run, or the run and one item"""
+        if self._cancelled.is_set():
+            return True
+        if key is None:
+            return False
+        with self._lock:
+            return key in self._items
+
+    def raise_if_cancelled(self, key: Optional[Hashable] = None):
+        if self.is_cancelled(key):
+            raise Cancelled(f"{key} was cancelled" if key is not None else "Cancelled")
+
+    @contextmanager
+    def on_cancel(self, callback: Callable[[], None], keys: Optional[Iterable[Hashable]] = None):
+        """Call ``callback`` if the run, or any of ``keys``, is cancelled inside the block
+
+        With ``keys`` the callback is for work covering all of those items,
+        like a batched inference call. It fires only once every key is
+        cancelled, so cancelling one image never aborts its batch-mates.
+        """
+        keys = frozenset(keys) if keys is not None else None
+        callback_id = next(self._ids)
+        with self._lock:
+            self._callbacks[callback_id] = (keys, callback)
+        try:
+            if self.is_cancelled() or (keys and all(self.is_cancelled(key) for key in keys)):
+                callback()
+            yield
+        finally:
+            with self._lock:
+                self._callbacks.pop(callback_id, None)
@@ -0,0 +1,176 @@
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from enum import Enum
+from typing import List, Optional, Set, Tuple
+
+from PySide6.QtCore import QThread, Signal
+from PIL import Image
+
+from utils.image_utils import qimage_to_pil
+
+
+class ExportFormat(Enum):
+    """Output file format"""
+    PNG = "png"
+    WEBP = "webp"  # always lossless
+
+    @property
+    def extension(self) -> str:
+        return f".{self.value}"
+
+
+class ConflictPolicy(Enum):
+    """What to do when the output file already exists"""
+    SKIP = "skip"
+    OVERWRITE = "overwrite"
+    SUFFIX = "suffix"  # write name_1.png, name_2.png, ...
+
+
+@dataclass
+class ExportOptions:
+    """Settings for writing processed images"""
+    format: ExportFormat = ExportFormat.PNG
+    compress_level: int = 6  # PNG zlib level, 0 (fastest) to 9 (smallest)
+    trim: bool = False  # crop to the bounds of the non-transparent pixels
+    conflict: ConflictPolicy = ConflictPolicy.SUFFIX
+    max_workers: int = 0  # 0 = one per core, at most 8
+
+
+def export_filename(save_filename: str, options: ExportOptions) -> str:
+    """Swap the extension of a ``*_nobg.png`` name for the chosen format"""
+    name, _ = os.path.splitext(save_filename)
+    return name + options.format.extension
+
+
+def resolve_target(path: str, options: ExportOptions, reserved: Set[str]) -> Optional[str]:
+    """Apply the conflict policy to ``path``; None means skip
+
+    The policy only applies to files that were already on disk. ``reserved``
+    holds targets already claimed in this export; a source whose target was
+    claimed by another one always gets a suffixed name, whatever the policy,
+    so two sources with the same output name never write to the same file.
+    """
+    exists = os.path.exists(path)
+    if exists and path not in reserved:
+        if options.conflict == ConflictPolicy.SKIP:
+            return None
+        if options.conflict == ConflictPolicy.OVERWRITE:
+            reserved.add(path)
+            return path
+    if exists or path in reserved:
+        # Claimed by another source in this export, or on disk under SUFFIX
+        name, extension = os.path.splitext(path)
+        counter = 1
+        while os.path.exists(path) or path in reserved:
+            path = f"{name}_{counter}{extension}"
+            counter += 1
+    reserved.add(path)
+    return path
+
+
+def trim_to_alpha(image: Image.Image) -> Image.Image:
+    """Crop away fully transparent borders"""
+    bbox = image.getchannel('A').getbbox()
+    return image.crop(bbox) if bbox else image
+
+
+def write_image(image: Image.Image, path: str, options: ExportOptions) -> str:
+    """Encode ``image`` and atomically move it to ``path``"""
+    if image.mode != 'RGBA':
+        image = image.convert('RGBA')
+    if options.trim:
+        image = trim_to_alpha(image)
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".part")
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            if options.format == ExportFormat.WEBP:
+                image.save(handle, format='WEBP', lossless=True)
+            else:
+                image.save(handle, format='PNG', compress_level=options.compress_level)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return path
+
+
+class ExportWorker(QThread):
+    """Writes processed images to disk on a background pool
+
+    ``items`` holds ``(source_path, save_filename, image)`` tuples, where the
+    image is a QImage or PIL image, or a callable returning one. For every
+    item, in completion order, one of ``image_saved``, ``image_skipped`` or
+    ``error_occurred`` is emitted, followed by ``progress``.
+    """
+    progress = Signal(int)
+    image_saved = Signal(str, str)  # source_path, target_path
+    image_skipped = Signal(str, str)  # source_path, existing target_path
+    error_occurred = Signal(str, str)  # source_path, error_message
+    all_finished = Signal()
+
+    def __init__(self, items: List[Tuple[str, str, object]], save_dir: str,
+                 options: Optional[ExportOptions] = None):
+        super().__init__()
+        self.items = items
+        self.save_dir = save_dir
+        self.options = options or ExportOptions()
+        self.running = True
+
+    def run(self):
+        total = len(self.items)
+        done = 0
+        done_lock = threading.Lock()
+
+        def report(signal, source_path: str, detail: str):
+            nonlocal done
+            with done_lock:
+                done += 1
+                value = int(done / total * 100)
+            signal.emit(source_path, detail)
+            self.progress.emit(value)
+
+        # Resolve every target up front so suffixes never collide across threads
+        reserved: Set[str] = set()
+        jobs = []
+        for source_path, save_filename, image in self.items:
+            path = os.path.join(self.save_dir, export_filename(save_filename, self.options))
+            target = resolve_target(path, self.options, reserved)
+            if target is None:
+                report(self.image_skipped, source_path, path)
+            else:
+                jobs.append((source_path, target, image))
+
+        max_workers = self.options.max_workers or min(8, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export") as executor:
+            futures = {}
+            for source_path, target, image in jobs:
+                if not self.running:
+                    break
+                futures[executor.submit(self._export_one, image, target)] = source_path
+            for future in as_completed(futures):
+                source_path = futures[future]
+                try:
+                    report(self.image_saved, source_path, future.result())
+                except Exception as e:
+                    report(self.error_occurred, source_path, str(e))
+
+        self.all_finished.emit()
+
+    def stop(self):
+        self.running = False
+
+    def _export_one(self, image, target: str) -> str:
+        if not self.running:
+            raise RuntimeError("Export cancelled")
+        if callable(image):
+            image = image()
+        if not isinstance(image, Image.Image):
+            image = qimage_to_pil(image)
+        return write_image(image, target, self.options)
@@ -0,0 +1,140 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Sequence, Tuple
+
+from PySide6.QtCore import QThread, Signal
+
+from utils.image_utils import sniff_image_format
+
+CHUNK_SIZE = 500  # images per images_found emission
+CHUNK_INTERVAL = 0.1  # seconds; emit a partial chunk at least this often
+SNIFF_BATCH_SIZE = 256  # files sniffed per pool task
+
+
+def default_scan_workers() -> int:
+    # Sniffing is I/O bound, so use more threads than cores, bounded for network drives
+    return min(32, (os.cpu_count() or 2) * 4)
+
+
+class FolderScanner(QThread):
+    """Finds every image under some folders on a background thread pool
+
+    Directories are listed with ``os.scandir`` and their files are sniffed
+    for a PNG, JPEG, BMP or WEBP signature in batches, all in parallel, so
+    one huge directory is spread over the pool just like many small ones.
+    The file type comes from the magic bytes, never the extension. Files
+    that cannot be read, are not images, or are hidden are skipped, as are
+    directory symlinks, so loops cannot trap the scan.
+
+    Images are streamed through ``images_found`` in chunks of up to
+    ``chunk_size`` while the scan runs, at least every ``chunk_interval``
+    seconds, in the order their sniff batches finish rather than directory
+    order. ``scan_finished`` always comes last. ``stop`` returns at once.
+    """
+    images_found = Signal(list)  # paths of images, in the order they were sniffed
+    scan_progress = Signal(int, int)  # images found, files skipped so far
+    scan_finished = Signal(int, int)  # images found, files skipped
+
+    def __init__(self, paths: Sequence[str], max_workers: int = 0,
+                 chunk_size: int = CHUNK_SIZE, chunk_interval: float = CHUNK_INTERVAL):
+        super().__init__()
+        self.paths = list(paths)
+        self.max_workers = max_workers or default_scan_workers()
+        self.chunk_size = chunk_size
+        self.chunk_interval = chunk_interval
+        self._stop = threading.Event()
+
+    def stop(self):
+        """Stop scanning without waiting; no more chunks are emitted"""
+        self._stop.set()
+
+    def run(self):
+        results: "queue.Queue[Tuple[List[str], List[str], List[str], int]]" = queue.Queue()
+        found = skipped = 0
+        chunk: List[str] = []
+        last_emit = time.monotonic()
+
+        def flush():
+            nonlocal chunk, last_emit
+            if chunk and not self._stop.is_set():
+                self.images_found.emit(chunk)
+                self.scan_progress.emit(found, skipped)
+            chunk = []
+            last_emit = time.monotonic()
+
+        pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="scan")
+        pending = 0
+
+        def submit(func, argument):
+            nonlocal pending
+            pending += 1
+            pool.submit(self._run_task, func, argument, results)
+
+        try:
+            files = []
+            for path in self.paths:
+                if os.path.isdir(path):
+                    submit(self._list_directory, path)
+                else:
+                    files.append(path)
+            for start in range(0, len(files), SNIFF_BATCH_SIZE):
+                submit(self._sniff, files[start:start + SNIFF_BATCH_SIZE])
+
+            while pending and not self._stop.is_set():
+                try:
+                    images, directories, candidates, rejected = results.get(timeout=self.chunk_interval)
+                except queue.Empty:
+                    flush()
+                    continue
+                pending -= 1
+                for directory in directories:
+                    submit(self._list_directory, directory)
+                for start in range(0, len(candidates), SNIFF_BATCH_SIZE):
+                    submit(self._sniff, candidates[start:start + SNIFF_BATCH_SIZE])
+                found += len(images)
+                skipped += rejected
+                chunk.extend(images)
+                if len(chunk) >= self.chunk_size or time.monotonic() - last_emit >= self.chunk_interval:
+                    flush()
+            flush()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        self.scan_finished.emit(found, skipped)
+
+    def _run_task(self, func, argument, results: queue.Queue):
+        # Every task reports exactly once, so the pending count always drains
+        if self._stop.is_set():
+            results.put(([], [], [], 0))
+            return
+        try:
+            results.put(func(argument))
+        except Exception:
+            results.put(([], [], [], 0))
+
+    @staticmethod
+    def _list_directory(directory: str) -> Tuple[List[str], List[str], List[str], int]:
+        """Split a directory into sub-directories and files to sniff"""
+        directories, files = [], []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in sorted(entries, key=lambda entry: entry.name):
+                    if entry.name.startswith('.'):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            directories.append(entry.path)
+                        elif entry.is_file():
+                            files.append(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return [], directories, files, 0
+
+    @staticmethod
+    def _sniff(paths: List[str]) -> Tuple[List[str], List[str], List[str], int]:
+        images = [path for path in paths if sniff_image_format(path) is not None]
+        return images, [], [], len(paths) - len(images)
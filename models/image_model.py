@@ -1,31 +1,115 @@
 from dataclasses import dataclass
+from enum import Enum
 from typing import Optional
 from PySide6.QtGui import QImage
-import uuid
+import itertools
 import os
+from .result_store import ResultHandle
 
-@dataclass
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+
+class ImageState(Enum):
+    """Processing state of an image"""
+    PENDING = "pending"
+    IN_FLIGHT = "in_flight"
+    DONE = "done"
+    FAILED = "failed"
+    STALE = "stale"  # processed, but the source file changed since
+
+class ResultQuality(Enum):
+    """Which pass produced a result"""
+    PREVIEW = "preview"  # fast model at low resolution, replaced by the full pass
+    FULL = "full"
+
+_ids = itertools.count()
+
+@dataclass(slots=True, eq=False)
 class ImageModel:
-    """Model representing an image with its metadata"""
+    """Model representing an image with its metadata
+
+    Slotted and kept small, since a registry may hold 100k of them.
+    """
     path: str
-    filename: str
-    id: str
-    processed_image: Optional[QImage] = None
+    id: int
+    result: Optional[ResultHandle] = None  # full-size alpha mask, held by a ResultStore
+    thumbnail: Optional[QImage] = None  # small preview of the output
+    quality: Optional[ResultQuality] = None
     is_processed: bool = False
-    
+    state: ImageState = ImageState.PENDING
+    error: Optional[str] = None
+    source_mtime: Optional[float] = None  # source stat at the time it was processed
+    source_size: Optional[int] = None
+    content_hash: Optional[str] = None  # SHA-256 of the source bytes, once known
+
     def __init__(self, path: str):
         self.path = path
-        self.filename = os.path.basename(path)
-        self.id = str(uuid.uuid4())
-        self.processed_image = None
+        self.id = next(_ids)
+        self.result = None
+        self.thumbnail = None
+        self.quality = None
         self.is_processed = False
-    
-    def set_processed_image(self, image: QImage):
-        """Set the processed image and mark as processed"""
-        self.processed_image = image
+        self.state = ImageState.PENDING
+        self.error = None
+        self.source_mtime = None
+        self.source_size = None
+        self.content_hash = None
+
+    @property
+    def filename(self) -> str:
+        return os.path.basename(self.path)
+
+    def set_result(self, result: ResultHandle, thumbnail: Optional[QImage] = None,
+                   quality: ResultQuality = ResultQuality.FULL):
+        """Set the processed result and mark as processed
+
+        A preview result leaves the image in flight while the full pass runs.
+        """
+        self.result = result
+        self.thumbnail = thumbnail
+        self.quality = quality
         self.is_processed = True
-    
+        if quality == ResultQuality.FULL or self.state != ImageState.IN_FLIGHT:
+            self.state = ImageState.DONE
+        self.error = None
+        self.source_mtime, self.source_size = self._stat_source()
+
+    def mark_in_flight(self):
+        """Mark the image as scheduled for processing"""
+        self.state = ImageState.IN_FLIGHT
+
+    def mark_failed(self, error: str):
+        """Mark the image as failed"""
+        self.state = ImageState.FAILED
+        self.error = error
+
+    def reset_in_flight(self):
+        """Return an image whose processing was interrupted to its previous state"""
+        if self.state == ImageState.IN_FLIGHT:
+            self.state = ImageState.DONE if self.is_processed else ImageState.PENDING
+            self.refresh_state()
+
+    def refresh_state(self) -> ImageState:
+        """Mark a processed image stale if its source changed on disk"""
+        if self.state == ImageState.DONE and self._stat_source() != (self.source_mtime, self.source_size):
+            self.state = ImageState.STALE
+        return self.state
+
+    def needs_processing(self) -> bool:
+        """Check if the image has no up-to-date, full-quality result and is not already queued"""
+        state = self.refresh_state()
+        if state == ImageState.DONE:
+            return self.quality == ResultQuality.PREVIEW
+        return state in (ImageState.PENDING, ImageState.FAILED, ImageState.STALE)
+
     def get_save_filename(self) -> str:
         """Get the filename for saving processed image"""
         name, _ = os.path.splitext(self.filename)
-        return f"{name}_nobg.png"
\ No newline at end of file
+        return f"{name}_nobg.png"
+
+    def _stat_source(self) -> tuple:
+        """Get the (mtime, size) of the source file"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None, None
+        return stat.st_mtime, stat.st_size
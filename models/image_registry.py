@@ -0,0 +1,122 @@
+import hashlib
+import os
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from utils.image_utils import sniff_image_format
+from .image_model import ImageModel
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's bytes, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ImageRegistry(QObject):
+    """Every image in the session, in the order it was added
+
+    Images are kept in a list with dictionaries from path and from content
+    hash to their position, so lookups by either are O(1) and so is finding
+    an image's row. ``add_many`` validates and dedupes a whole batch and
+    emits ``images_added`` once for it, however many files it held.
+    """
+    images_added = Signal(list)  # ImageModels new in one add_many call
+    cleared = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._models: List[ImageModel] = []
+        self._rows: Dict[str, int] = {}
+        self._hashes: Dict[str, int] = {}  # content hash -> row
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def __iter__(self) -> Iterator[ImageModel]:
+        return iter(self._models)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._rows
+
+    def __getitem__(self, path: str) -> ImageModel:
+        return self._models[self._rows[path]]
+
+    def get(self, path: str) -> Optional[ImageModel]:
+        row = self._rows.get(path)
+        return self._models[row] if row is not None else None
+
+    def values(self) -> List[ImageModel]:
+        return list(self._models)
+
+    def paths(self) -> List[str]:
+        return list(self._rows)
+
+    def row(self, path: str) -> Optional[int]:
+        return self._rows.get(path)
+
+    def find_by_hash(self, content_hash: str) -> Optional[ImageModel]:
+        """The image whose source bytes have this SHA-256, if one is known"""
+        row = self._hashes.get(content_hash)
+        return self._models[row] if row is not None else None
+
+    def set_content_hash(self, path: str, content_hash: str):
+        """Record the SHA-256 of an image's source, e.g. once it has been read"""
+        row = self._rows.get(path)
+        if row is None:
+            return
+        model = self._models[row]
+        if model.content_hash is not None and self._hashes.get(model.content_hash) == row:
+            del self._hashes[model.content_hash]
+        model.content_hash = content_hash
+        self._hashes.setdefault(content_hash, row)
+
+    def add(self, path: str) -> Optional[ImageModel]:
+        added = self.add_many([path])
+        return added[0] if added else None
+
+    def add_many(self, paths: Iterable[str], hash_contents: bool = False,
+                 sniffed: bool = False) -> List[ImageModel]:
+        """Add the supported image files among ``paths`` that are not registered yet
+
+        Files are recognized by their magic bytes, not their extension;
+        pass ``sniffed`` when a ``FolderScanner`` has checked them already.
+        Paths are normalized before comparing, so the same file reached two
+        ways is added once. With ``hash_contents`` every new file is hashed
+        and files whose bytes match an image already registered are skipped
+        too. Returns the new images, in order.
+        """
+        added = []
+        for path in paths:
+            path = os.path.normpath(os.path.abspath(path))
+            if path in self._rows or not (sniffed or sniff_image_format(path)):
+                continue
+            content_hash = None
+            if hash_contents:
+                try:
+                    content_hash = file_digest(path)
+                except OSError:
+                    continue
+                if content_hash in self._hashes:
+                    continue
+            model = ImageModel(path)
+            self._rows[path] = len(self._models)
+            self._models.append(model)
+            if content_hash is not None:
+                self.set_content_hash(path, content_hash)
+            added.append(model)
+        if added:
+            self.images_added.emit(added)
+        return added
+
+    def clear(self):
+        self._models.clear()
+        self._rows.clear()
+        self._hashes.clear()
+        self.cleared.emit()
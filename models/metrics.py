@@ -0,0 +1,103 @@
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Optional
+
+
+@dataclass
+class ImageMetrics:
+    """What happened to one image on its way through the engine"""
+    path: str
+    model: str = ""
+    status: str = "ok"  # ok, error or cancelled
+    error: Optional[str] = None
+    width: int = 0  # source dimensions as stored in the file
+    height: int = 0
+    proxied: bool = False
+    from_cache: bool = False
+    bytes_read: int = 0
+    bytes_written: int = 0  # cache entries and output files
+    content_hash: Optional[str] = None  # SHA-256 of the source, when its bytes were read whole
+    stages: Dict[str, float] = field(default_factory=dict)  # stage name -> seconds
+    workers: Dict[str, str] = field(default_factory=dict)  # stage name -> worker thread
+    started_at: float = 0.0  # wall clock, seconds since the epoch
+    finished_at: float = 0.0
+
+    @property
+    def total_seconds(self) -> float:
+        """Time from starting to decode to being reported, queueing included"""
+        return max(0.0, self.finished_at - self.started_at)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data['total_seconds'] = self.total_seconds
+        return data
+
+
+class MetricsTrace:
+    """Appends ImageMetrics to a JSON-lines file, one object per image"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def write(self, metrics: ImageMetrics):
+        line = json.dumps(metrics.to_dict())
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + "\n")
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class ThroughputMeter:
+    """Recent throughput and time remaining, from per-image finish times
+
+    The rate is taken over a sliding window of the last ``window`` images so
+    the estimate follows changes in image size or load instead of averaging
+    over the whole run.
+    """
+
+    def __init__(self, total: int = 0, window: int = 20):
+        self.total = total
+        self.done = 0
+        self._finished = deque(maxlen=window)
+        self._started = time.time()
+
+    def start(self, total: int):
+        self.total = total
+        self.done = 0
+        self._finished.clear()
+        self._started = time.time()
+
+    def add(self, finished_at: float):
+        self.done += 1
+        self._finished.append(finished_at)
+
+    def drop(self, count: int = 1):
+        """Take images that will not be processed after all out of the total"""
+        self.total -= count
+
+    def images_per_second(self) -> float:
+        if not self._finished:
+            return 0.0
+        if len(self._finished) == 1:
+            elapsed = self._finished[0] - self._started
+            return 1 / elapsed if elapsed > 0 else 0.0
+        elapsed = self._finished[-1] - self._finished[0]
+        return (len(self._finished) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def eta_seconds(self) -> Optional[float]:
+        """Seconds until the run finishes, or None before there is a rate"""
+        rate = self.images_per_second()
+        if rate <= 0:
+            return None
+        return max(0, self.total - self.done) / rate
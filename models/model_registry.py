@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import rembg
+from PIL import Image
+from PySide6.QtCore import QThread, Signal
+from rembg.sessions import sessions_class
+
+from .removal_engine import EngineConfig
+from .session_manager import session_manager, DEFAULT_MODEL
+
+PREVIEW_MODEL = 'u2netp'  # used for the quick first pass
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """A rembg model the app knows how to use"""
+    name: str
+    input_size: int  # square side the model resizes every image to
+    description: str
+    # Other names the weights have been downloaded under, e.g. the release asset's
+    filenames: Tuple[str, ...] = ()
+
+
+# Models that load from their name alone, fastest first within each family
+MODEL_SPECS: List[ModelSpec] = [
+    ModelSpec('u2netp', 320, "Small U2-Net; fast, good for previews"),
+    ModelSpec('silueta', 320, "Compressed U2-Net; low memory"),
+    ModelSpec('u2net', 320, "General purpose (default)"),
+    ModelSpec('u2net_human_seg', 320, "People"),
+    ModelSpec('u2net_cloth_seg', 768, "Clothing, split into upper, lower and full body"),
+    ModelSpec('isnet-general-use', 1024, "General purpose, finer edges"),
+    ModelSpec('isnet-anime', 1024, "Anime characters"),
+    ModelSpec('birefnet-general-lite', 1024, "BiRefNet, lighter variant"),
+    ModelSpec('birefnet-general', 1024, "BiRefNet; highest quality, slowest"),
+    ModelSpec('birefnet-portrait', 1024, "BiRefNet for portraits"),
+    ModelSpec('bria-rmbg', 1024, "BRIA RMBG", filenames=('bria-rmbg-2.0.onnx',)),
+]
+
+
+@dataclass
+class ModelInfo:
+    """What the registry knows about one model on this machine"""
+    name: str
+    input_size: int
+    description: str
+    path: Optional[str] = None  # local ONNX file; None until downloaded
+    file_bytes: int = 0  # size of the weights, roughly what a loaded session occupies
+    loaded: bool = False
+    seconds_per_image: Optional[float] = None  # measured by the last warm-up
+
+    @property
+    def available(self) -> bool:
+        return self.path is not None
+
+    def summary(self) -> str:
+        """One line for menus: name, input size, footprint and speed"""
+        parts = [self.name, f"{self.input_size}px"]
+        if self.file_bytes:
+            parts.append(f"{self.file_bytes / 2 ** 20:.1f} MB")
+        if self.seconds_per_image is not None:
+            parts.append(f"{self.seconds_per_image * 1000:.0f} ms/image")
+        return " · ".join(parts)
+
+
+class ModelRegistry:
+    """Lists the models available locally and warms up their sessions
+
+    Nothing is loaded until a model is used or warmed up; sessions are
+    created on demand by the shared ``SessionManager``. Warming up runs a
+    dummy inference on every session an engine with the same config would
+    use, so the first real image does not pay for loading the weights and
+    for onnxruntime's first-run allocations. The time of a second, warm
+    inference is kept as the model's speed.
+    """
+
+    def __init__(self, specs: List[ModelSpec] = MODEL_SPECS):
+        self._specs: Dict[str, ModelSpec] = {spec.name: spec for spec in specs}
+        self._speeds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    def model_path(self, name: str) -> Optional[str]:
+        """Path of the downloaded ONNX file for ``name``, or None"""
+        session_class = next((cls for cls in sessions_class if cls.name() == name), None)
+        if session_class is None:
+            return None
+        spec = self._specs.get(name)
+        # rembg saves the weights as <name>.onnx; older releases kept the asset's own name
+        for filename in (f"{name}.onnx", *(spec.filenames if spec else ())):
+            path = session_class.resolve_existing(filename)
+            if path is not None:
+                return path
+        return None
+
+    def info(self, name: str) -> ModelInfo:
+        spec = self._specs.get(name) or ModelSpec(name, 0, "")
+        path = self.model_path(name)
+        with self._lock:
+            speed = self._speeds.get(name)
+        return ModelInfo(
+            name=spec.name,
+            input_size=spec.input_size,
+            description=spec.description,
+            path=path,
+            file_bytes=os.path.getsize(path) if path else 0,
+            loaded=session_manager.has_session(name),
+            seconds_per_image=speed,
+        )
+
+    def models(self, include_missing: bool = False) -> List[ModelInfo]:
+        """Known models, only the downloaded ones unless ``include_missing``"""
+        infos = [self.info(name) for name in self._specs]
+        return [info for info in infos if include_missing or info.available]
+
+    def warm_up(self, config: EngineConfig) -> float:
+        """Load and exercise every session for ``config``; returns seconds per image"""
+        spec = self._specs.get(config.model_name)
+        side = spec.input_size if spec else 320
+        # Noise rather than a flat colour, so the mask has a range to normalize
+        dummy = Image.effect_noise((side, side), 64).convert('RGB')
+        sessions = [
+            session_manager.get_session(
+                config.model_name,
+                config.providers,
+                intra_op_threads=config.resolved_intra_op_threads(),
+                slot=slot,
+            )
+            for slot in range(max(1, config.num_workers))
+        ]
+        for session in sessions:
+            rembg.remove(dummy, session=session, only_mask=True)
+
+        started = time.perf_counter()
+        rembg.remove(dummy, session=sessions[0], only_mask=True)
+        seconds = time.perf_counter() - started
+        with self._lock:
+            self._speeds[config.model_name] = seconds
+        return seconds
+
+
+# Shared by the GUI and the command line
+model_registry = ModelRegistry()
+
+
+class ModelWarmupWorker(QThread):
+    """Warms up a model's sessions off the GUI thread, the preview model's first"""
+    model_ready = Signal(str, float)  # model name, seconds per image
+    error_occurred = Signal(str, str)  # model name, error message
+
+    def __init__(self, config: Optional[EngineConfig] = None, registry: ModelRegistry = model_registry):
+        super().__init__()
+        self.config = config or EngineConfig(model_name=DEFAULT_MODEL)
+        self.registry = registry
+
+    def run(self):
+        configs = [self.config]
+        if self.config.preview_model:
+            configs.insert(0, self.config.preview())
+        for config in configs:
+            try:
+                seconds = self.registry.warm_up(config)
+            except Exception as e:
+                self.error_occurred.emit(config.model_name, str(e))
+                continue
+            self.model_ready.emit(config.model_name, seconds)
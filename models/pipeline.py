@@ -0,0 +1,305 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+_SENTINEL = object()
+MAX_LATENCY_SAMPLES = 10_000
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Linear-interpolated percentile of an already sorted sequence"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+@dataclass
+class StageConfig:
+    """Concurrency and back-pressure settings for one pipeline stage"""
+    workers: int = 1
+    queue_size: int = 2  # items allowed to wait in front of the stage
+    batch_size: int = 1  # items handed to the stage's batch function at once
+
+
+class StageStats:
+    """Throughput counters for one pipeline stage"""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0  # summed over workers
+        self.blocked_seconds = 0.0  # time spent waiting on a full downstream queue
+        self.first_start: Optional[float] = None
+        self.last_end: Optional[float] = None
+        # Per-item latencies; items in one batch all waited for the whole batch
+        self.latencies: List[float] = []
+        self._lock = threading.Lock()
+
+    def record(self, started: float, finished: float, processed: int = 1, failed: int = 0):
+        with self._lock:
+            self.processed += processed
+            self.failed += failed
+            self.busy_seconds += finished - started
+            if len(self.latencies) < MAX_LATENCY_SAMPLES:
+                self.latencies.extend([finished - started] * (processed + failed))
+            if self.first_start is None or started < self.first_start:
+                self.first_start = started
+            if self.last_end is None or finished > self.last_end:
+                self.last_end = finished
+
+    def record_blocked(self, seconds: float):
+        with self._lock:
+            self.blocked_seconds += seconds
+
+    @property
+    def wall_seconds(self) -> float:
+        if self.first_start is None or self.last_end is None:
+            return 0.0
+        return self.last_end - self.first_start
+
+    @property
+    def throughput(self) -> float:
+        """Items per second the stage sustained while it was active"""
+        wall = self.wall_seconds
+        return (self.processed + self.failed) / wall if wall > 0 else 0.0
+
+    @property
+    def capacity(self) -> float:
+        """Items per second the stage could sustain if it never waited"""
+        if self.busy_seconds <= 0:
+            return 0.0
+        return (self.processed + self.failed) * self.workers / self.busy_seconds
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of worker time spent doing work"""
+        wall = self.wall_seconds
+        return self.busy_seconds / (wall * self.workers) if wall > 0 else 0.0
+
+    def latency_percentiles(self) -> Dict[str, float]:
+        """p50/p95/p99 of the per-item latency in seconds"""
+        with self._lock:
+            latencies = sorted(self.latencies)
+        return {name: percentile(latencies, fraction)
+                for name, fraction in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99))}
+
+    def snapshot(self) -> dict:
+        latency = self.latency_percentiles()
+        with self._lock:
+            return {
+                'name': self.name,
+                'workers': self.workers,
+                'processed': self.processed,
+                'failed': self.failed,
+                'busy_seconds': self.busy_seconds,
+                'blocked_seconds': self.blocked_seconds,
+                'throughput': self.throughput,
+                'capacity': self.capacity,
+                'utilization': self.utilization,
+                'latency': latency,
+            }
+
+
+class Stage:
+    """A named step of the pipeline backed by its own worker threads
+
+    When ``config.batch_size`` is above one and ``batch_func`` is given, each
+    worker drains up to that many queued items and hands them over together.
+    ``batch_func`` returns one value per input, using an exception instance
+    for items that failed.
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Any], config: Optional[StageConfig] = None,
+                 batch_func: Optional[Callable[[List[Any]], List[Any]]] = None):
+        self.name = name
+        self.func = func
+        self.batch_func = batch_func
+        self.config = config or StageConfig()
+        self.stats = StageStats(name, self.config.workers)
+
+    @property
+    def batch_size(self) -> int:
+        if self.batch_func is None:
+            return 1
+        return max(1, self.config.batch_size)
+
+    def process(self, values: List[Any]) -> List[tuple]:
+        """Run the stage on ``values`` and return ``(value, error)`` pairs"""
+        started = time.perf_counter()
+        if self.batch_size > 1:
+            try:
+                outputs = self.batch_func(values)
+            except Exception as e:
+                outputs = [e] * len(values)
+            results = [(None, out) if isinstance(out, Exception) else (out, None) for out in outputs]
+        else:
+            results = []
+            for value in values:
+                try:
+                    results.append((self.func(value), None))
+                except Exception as e:
+                    results.append((None, e))
+        failed = sum(1 for _, error in results if error is not None)
+        self.stats.record(started, time.perf_counter(), len(results) - failed, failed)
+        return results
+
+
+class Pipeline:
+    """Streams items through a chain of stages connected by bounded queues
+
+    Every stage runs ``workers`` threads that pull from a queue holding at
+    most ``queue_size`` items, so a slow stage pushes back on the ones before
+    it instead of letting work pile up. ``max_in_flight`` caps the total number
+    of items admitted but not yet delivered, which also bounds the reorder
+    buffer used to deliver outputs in input order.
+
+    A failure in any stage skips the remaining stages for that item and is
+    delivered to ``on_error``.
+
+    The next item is pulled from ``items`` only once there is room for it,
+    so an iterator that reorders its remaining items (see
+    ``PriorityScheduler``) is honoured right up to admission.
+    """
+
+    def __init__(self, stages: List[Stage], max_in_flight: int = 0):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        self.stages = stages
+        self.max_in_flight = max_in_flight or sum(
+            stage.config.workers + stage.config.queue_size for stage in stages)
+
+    @property
+    def stats(self) -> Dict[str, StageStats]:
+        return {stage.name: stage.stats for stage in self.stages}
+
+    def bottleneck(self) -> Optional[str]:
+        """Name of the stage with the lowest capacity so far"""
+        measured = [stage.stats for stage in self.stages if stage.stats.capacity > 0]
+        if not measured:
+            return None
+        return min(measured, key=lambda stats: stats.capacity).name
+
+    def run(self, items: Iterable[Any],
+            on_output: Callable[[int, Any, Any], None],
+            on_error: Callable[[int, Any, Exception], None],
+            should_stop: Callable[[], bool] = lambda: False,
+            ordered: bool = True):
+        """Push ``items`` through all stages and deliver their results
+
+        Results are delivered in input order, or with ``ordered=False`` as
+        soon as each one finishes. ``index`` is the order of admission.
+        """
+        queues = [queue.Queue(maxsize=max(1, stage.config.queue_size)) for stage in self.stages]
+        output_queue = queue.Queue()
+        admission = threading.Semaphore(self.max_in_flight)
+        stopped = threading.Event()
+        threads = []
+
+        def is_stopped() -> bool:
+            if not stopped.is_set() and should_stop():
+                stopped.set()
+            return stopped.is_set()
+
+        def feed():
+            iterator = iter(items)
+            index = 0
+            while True:
+                while not admission.acquire(timeout=0.1):
+                    if is_stopped():
+                        break
+                if is_stopped():
+                    break
+                item = next(iterator, _SENTINEL)
+                if item is _SENTINEL:
+                    break
+                queues[0].put((index, item, item, None))
+                index += 1
+            for _ in range(self.stages[0].config.workers):
+                queues[0].put(_SENTINEL)
+
+        for position, stage in enumerate(self.stages):
+            inbox = queues[position]
+            is_last = position == len(self.stages) - 1
+            outbox = output_queue if is_last else queues[position + 1]
+            next_workers = 1 if is_last else self.stages[position + 1].config.workers
+            remaining = [stage.config.workers]
+            remaining_lock = threading.Lock()
+
+            def work(stage=stage, inbox=inbox, outbox=outbox, next_workers=next_workers,
+                     remaining=remaining, remaining_lock=remaining_lock):
+                done = False
+                while not done:
+                    # Block for one item, then take whatever else is already queued
+                    packets = []
+                    packet = inbox.get()
+                    while True:
+                        if packet is _SENTINEL:
+                            done = True
+                            break
+                        packets.append(packet)
+                        if len(packets) >= stage.batch_size:
+                            break
+                        try:
+                            packet = inbox.get_nowait()
+                        except queue.Empty:
+                            break
+
+                    live = [i for i, packet in enumerate(packets)
+                            if packet[3] is None and not is_stopped()]
+                    if live:
+                        results = stage.process([packets[i][2] for i in live])
+                        for i, (value, error) in zip(live, results):
+                            index, item, _, _ = packets[i]
+                            packets[i] = (index, item, value, error)
+
+                    blocked = time.perf_counter()
+                    for packet in packets:
+                        outbox.put(packet)
+                    stage.stats.record_blocked(time.perf_counter() - blocked)
+
+                with remaining_lock:
+                    remaining[0] -= 1
+                    last_worker = remaining[0] == 0
+                if last_worker:
+                    for _ in range(next_workers):
+                        outbox.put(_SENTINEL)
+
+            for worker_id in range(stage.config.workers):
+                thread = threading.Thread(target=work, name=f"{stage.name}-{worker_id}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        feeder = threading.Thread(target=feed, name="pipeline-feed", daemon=True)
+        feeder.start()
+        threads.append(feeder)
+
+        # Deliver on the calling thread, in input order unless told otherwise
+        reorder: Dict[int, tuple] = {}
+        next_index = 0
+        while True:
+            packet = output_queue.get()
+            if packet is _SENTINEL:
+                break
+            reorder[packet[0]] = packet
+            if not ordered:
+                next_index = packet[0]
+            while next_index in reorder:
+                index, item, value, error = reorder.pop(next_index)
+                next_index += 1
+                admission.release()
+                if is_stopped():
+                    continue
+                if error is None:
+                    on_output(index, item, value)
+                else:
+                    on_error(index, item, error)
+
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,367 @@
+import io
+import os
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import onnxruntime as ort
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .batch_inference import BATCHABLE_MODELS, predict_masks, remove_mask, supports_batching
+from .cancellation import Cancelled, CancellationToken
+from .metrics import ImageMetrics
+from .pipeline import Pipeline, Stage, StageConfig
+from .result_cache import ResultCache
+from .session_manager import session_manager, DEFAULT_MODEL
+
+
+def default_worker_count() -> int:
+    """Pick a worker count that leaves each ONNX session a few cores"""
+    return max(1, min(4, (os.cpu_count() or 1) // 2))
+
+
+@dataclass
+class EngineConfig:
+    """Settings for the staged removal engine"""
+    num_workers: int = field(default_factory=default_worker_count)  # inference workers
+    intra_op_threads: int = 0  # 0 = share the cores evenly between inference workers
+    decode_workers: int = 2
+    encode_workers: int = 2
+    decode_queue_size: int = 0  # paths waiting to be decoded; 0 = 2 x decode workers
+    inference_queue_size: int = 0  # decoded images waiting for a session; 0 = 2 x workers
+    encode_queue_size: int = 0  # cutouts waiting to be encoded; 0 = 2 x encode workers
+    max_pending: int = 0  # images admitted but not yet reported; 0 = sum of stage capacities
+    batch_size: int = 1  # images per inference call when the model allows dynamic batches
+    model_name: str = DEFAULT_MODEL
+    providers: Optional[List[str]] = None
+    cache: Optional[ResultCache] = None  # serve and store results by content hash
+    large_image_pixels: int = 16_000_000  # above this, infer on a reduced proxy; 0 = never
+    proxy_max_side: int = 2048  # longest side of the proxy decoded for large images
+    preview_model: Optional[str] = None  # run a quick pass with this model first; None = single pass
+    preview_max_side: int = 320  # longest side images are decoded at for the preview pass
+
+    def cache_params(self, proxied: bool = False) -> dict:
+        """Settings that change the output and so belong in the cache key"""
+        return {'proxy_max_side': self.proxy_max_side} if proxied else {}
+
+    def is_large(self, size) -> bool:
+        """Check if an image should be decoded at reduced size for inference"""
+        width, height = size
+        return (0 < self.large_image_pixels < width * height
+                and max(width, height) > self.proxy_max_side)
+
+    def preview(self) -> "EngineConfig":
+        """Settings for the preview pass: the small model on every image, decoded small"""
+        return replace(self, model_name=self.preview_model or self.model_name, preview_model=None,
+                       large_image_pixels=1, proxy_max_side=self.preview_max_side)
+
+    def resolved_intra_op_threads(self) -> int:
+        if self.intra_op_threads > 0:
+            return self.intra_op_threads
+        return max(1, (os.cpu_count() or 1) // max(1, self.num_workers))
+
+    def stage_configs(self) -> Dict[str, StageConfig]:
+        def stage(workers: int, queue_size: int, batch_size: int = 1) -> StageConfig:
+            workers = max(1, workers)
+            batch_size = max(1, batch_size)
+            return StageConfig(workers=workers,
+                               queue_size=queue_size or workers * batch_size * 2,
+                               batch_size=batch_size)
+
+        return {
+            'decode': stage(self.decode_workers, self.decode_queue_size),
+            'inference': stage(self.num_workers, self.inference_queue_size, self.batch_size),
+            'encode': stage(self.encode_workers, self.encode_queue_size),
+        }
+
+
+@dataclass
+class RemovalJob:
+    """One image travelling through the engine's stages"""
+    path: str
+    image: Optional[Image.Image] = None  # upright source; None when served from the cache
+    mask: Optional[Image.Image] = None  # single-channel alpha
+    proxied: bool = False  # image and mask are reduced-size stand-ins for a large source
+    metrics: Optional[ImageMetrics] = None
+    cache_key: Optional[str] = None
+    from_cache: bool = False
+
+
+class RemovalEngine:
+    """Streams images through decode, inference and encode stages
+
+    Each stage has its own worker threads and bounded input queue, so disk
+    reads, inference and encoding overlap while memory stays flat. Every
+    inference worker owns its ONNX session. By default results are reported
+    strictly in input order; with ``run(..., ordered=False)`` each one is
+    reported as soon as it finishes, so a slow image does not hold back the
+    ones behind it. The engine has no Qt dependency; callers adapt the
+    callbacks to signals or files.
+
+    Inference produces an ``L`` alpha mask rather than an RGBA cutout. Masks
+    are a quarter of the size, and callers compose the cutout only when
+    they need the pixels (see ``utils.image_utils.apply_mask``).
+
+    Images over ``large_image_pixels`` are never decoded at full size here:
+    JPEGs are decoded straight at a reduced scale and everything is fitted
+    within ``proxy_max_side``. Their mask stays at that size, and
+    ``apply_mask`` upscales it against the full image in strips when the
+    cutout is composed.
+
+    With a ``ResultCache`` configured, the decode stage hashes the source
+    bytes it has already read and serves cached results without inference.
+
+    A ``CancellationToken`` passed to ``run`` is checked by every stage.
+    Cancelling the run also aborts inference calls already in progress,
+    and cancelling one path drops just that image wherever it is.
+
+    Every image also gets an ``ImageMetrics`` record with per-stage timings
+    and worker threads, its dimensions and the bytes read and written,
+    handed to ``on_metrics`` when the image is reported.
+    """
+
+    def __init__(self, config: Optional[EngineConfig] = None):
+        self.config = config or EngineConfig()
+        self.pipeline: Optional[Pipeline] = None
+        self._slots = threading.local()
+        self._slot_counter = 0
+        self._slot_lock = threading.Lock()
+        self._token = CancellationToken()
+        self._metrics: Dict[str, ImageMetrics] = {}
+        self._metrics_lock = threading.Lock()
+
+    def run(self, paths: Iterable[str],
+            finalize: Callable[[str, Image.Image, Optional[Image.Image], bool], Any],
+            on_result: Callable[[int, str, Any], None],
+            on_error: Callable[[int, str, str], None],
+            token: Optional[CancellationToken] = None,
+            on_cancelled: Callable[[int, str], None] = lambda index, path: None,
+            ordered: bool = True,
+            on_metrics: Callable[[ImageMetrics], None] = lambda metrics: None):
+        """Process ``paths`` and report each one in order, or as it finishes
+
+        ``finalize(path, mask, image, proxied)`` runs on an encode worker and
+        turns the mask into whatever the caller needs (a stored result, a
+        file on disk). ``image`` is the decoded upright source, or None on a
+        cache hit. With ``proxied`` it is the reduced-size proxy the mask was
+        predicted on: good for thumbnails, while a full-size cutout has to
+        be composed from the file.
+
+        ``paths`` may be a ``PriorityScheduler``, which is consulted each time
+        there is room for another image; pass ``ordered=False`` with it so
+        urgent images are reported without waiting for earlier ones.
+
+        Paths cancelled one by one are reported to ``on_cancelled``. Once the
+        whole run is cancelled nothing more is reported and ``run`` returns
+        as soon as the in-flight stages have wound down.
+        """
+        self._token = token or CancellationToken()
+        with self._metrics_lock:
+            self._metrics = {}
+        # Fresh pool threads claim slots 0..N-1 so sessions are reused across runs
+        self._slots = threading.local()
+        self._slot_counter = 0
+
+        def encode(job: RemovalJob):
+            self._token.raise_if_cancelled(job.path)
+            with self._timed('encode', [job]):
+                if self.config.cache is not None and not job.from_cache:
+                    written = self.config.cache.put(job.cache_key, job.mask)
+                    self.record_written(job.path, written)
+                return finalize(job.path, job.mask, job.image, job.proxied)
+
+        configs = self.config.stage_configs()
+        self.pipeline = Pipeline([
+            Stage('decode', self._decode, configs['decode']),
+            Stage('inference', self._infer, configs['inference'], batch_func=self._infer_batch),
+            Stage('encode', encode, configs['encode']),
+        ], max_in_flight=self.config.max_pending)
+        def finish(path: str, status: str, error: Optional[str] = None):
+            with self._metrics_lock:
+                metrics = self._metrics.pop(path, None) or ImageMetrics(path, self.config.model_name)
+            metrics.status = status
+            metrics.error = error
+            metrics.finished_at = time.time()
+            on_metrics(metrics)
+
+        def report_result(index: int, path: str, value):
+            on_result(index, path, value)
+            finish(path, "ok")
+
+        def report_error(index: int, path: str, error: Exception):
+            if isinstance(error, Cancelled):
+                on_cancelled(index, path)
+                finish(path, "cancelled")
+            else:
+                on_error(index, path, str(error))
+                finish(path, "error", str(error))
+
+        self.pipeline.run(
+            paths,
+            on_output=report_result,
+            on_error=report_error,
+            should_stop=self._token.is_cancelled,
+            ordered=ordered,
+        )
+
+    def stage_stats(self) -> Dict[str, dict]:
+        """Per-stage throughput counters for the current or last run"""
+        if self.pipeline is None:
+            return {}
+        return {name: stats.snapshot() for name, stats in self.pipeline.stats.items()}
+
+    def bottleneck(self) -> Optional[str]:
+        """Name of the stage limiting the current or last run, once one has been measured"""
+        if self.pipeline is None:
+            return None
+        return self.pipeline.bottleneck()
+
+    def record_written(self, path: str, size: int):
+        """Add to the bytes written for ``path``; ``finalize`` can report its output here"""
+        with self._metrics_lock:
+            metrics = self._metrics.get(path)
+            if metrics is not None:
+                metrics.bytes_written += size
+
+    def _timed(self, stage: str, jobs: List[RemovalJob]):
+        """Record how long ``jobs`` spent in ``stage`` and on which thread"""
+        engine = self
+
+        class Timer:
+            def __enter__(self):
+                self.started = time.perf_counter()
+
+            def __exit__(self, *exc_info):
+                elapsed = time.perf_counter() - self.started
+                worker = threading.current_thread().name
+                with engine._metrics_lock:
+                    for job in jobs:
+                        if job.metrics is not None:
+                            job.metrics.stages[stage] = elapsed
+                            job.metrics.workers[stage] = worker
+
+        return Timer()
+
+    def _decode(self, path: str) -> RemovalJob:
+        """Read a source image, serving it from the cache when possible"""
+        self._token.raise_if_cancelled(path)
+        job = RemovalJob(path, metrics=ImageMetrics(path, self.config.model_name, started_at=time.time()))
+        with self._metrics_lock:
+            self._metrics[path] = job.metrics
+        with self._timed('decode', [job]):
+            return self._read(job)
+
+    def _read(self, job: RemovalJob) -> RemovalJob:
+        path = job.path
+        cache = self.config.cache
+        if cache is not None:
+            with open(path, 'rb') as f:
+                data = f.read()
+            job.metrics.bytes_read = len(data)
+            try:
+                image = Image.open(io.BytesIO(data))
+            except UnidentifiedImageError:
+                raise UnidentifiedImageError(f"cannot identify image file {path!r}") from None
+        else:
+            image = Image.open(path)
+            job.metrics.bytes_read = os.path.getsize(path)
+
+        # Opening only parses the header, so the size is known before decoding
+        job.metrics.width, job.metrics.height = image.size
+        job.proxied = job.metrics.proxied = self.config.is_large(image.size)
+        if cache is not None:
+            params = self.config.cache_params(job.proxied)
+            job.metrics.content_hash = cache.content_hash(data)
+            job.cache_key = cache.make_key(job.metrics.content_hash, self.config.model_name, params)
+            job.mask = cache.get(job.cache_key)
+            if job.mask is not None:
+                job.from_cache = job.metrics.from_cache = True
+                return job
+
+        if job.proxied:
+            max_side = self.config.proxy_max_side
+            image.draft('RGB', (max_side, max_side))
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        else:
+            image = ImageOps.exif_transpose(image)
+        image.load()
+        job.image = image
+        return job
+
+    def _infer(self, job: RemovalJob) -> RemovalJob:
+        """Predict the alpha mask with this worker's session"""
+        self._token.raise_if_cancelled(job.path)
+        if job.mask is None:
+            session = self._session()
+            with self._timed('inference', [job]):
+                if session.model_name in BATCHABLE_MODELS:
+                    job.mask = self._predict(session, [job])[0]
+                else:
+                    # rembg's own pre- and post-processing, still abortable
+                    job.mask = self._abortable([job], lambda run_options: remove_mask(
+                        session, job.image, run_options))
+        return job
+
+    def _predict(self, session, jobs: List[RemovalJob]) -> List[Image.Image]:
+        """Run one inference call that stops early if all its jobs are cancelled"""
+        return self._abortable(jobs, lambda run_options: predict_masks(
+            session, [job.image for job in jobs], run_options))
+
+    def _abortable(self, jobs: List[RemovalJob], call: Callable[[ort.RunOptions], Any]) -> Any:
+        """Call ``call(run_options)``, terminating it once all of ``jobs`` are cancelled"""
+        run_options = ort.RunOptions()
+
+        def terminate():
+            run_options.terminate = True
+
+        with self._token.on_cancel(terminate, keys=[job.path for job in jobs]):
+            try:
+                return call(run_options)
+            except Exception:
+                if run_options.terminate:
+                    raise Cancelled("Inference was cancelled") from None
+                raise
+
+    def _infer_batch(self, jobs: List[RemovalJob]) -> List[Any]:
+        """Predict masks for several images in one session call
+
+        Falls back to one call per image when the model has a fixed batch
+        size, or when the batched call fails so the bad image can be isolated.
+        """
+        todo = [job for job in jobs if job.mask is None and not self._token.is_cancelled(job.path)]
+        session = self._session()
+        if len(todo) > 1 and supports_batching(session):
+            try:
+                with self._timed('inference', todo):
+                    masks = self._predict(session, todo)
+            except Exception:
+                pass
+            else:
+                for job, mask in zip(todo, masks):
+                    job.mask = mask
+                return jobs
+
+        results = []
+        for job in jobs:
+            try:
+                results.append(self._infer(job))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _session(self):
+        """Return the ONNX session owned by the current worker thread"""
+        slot = getattr(self._slots, 'slot', None)
+        if slot is None:
+            with self._slot_lock:
+                slot = self._slot_counter
+                self._slot_counter += 1
+            self._slots.slot = slot
+        return session_manager.get_session(
+            self.config.model_name,
+            self.config.providers,
+            intra_op_threads=self.config.resolved_intra_op_threads(),
+            slot=slot,
+        )
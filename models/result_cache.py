@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image
+
+from utils.platform_utils import get_cache_dir
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 2 GiB
+CACHE_VERSION = 2  # bump when the stored output format changes
+EVICT_TO = 0.9  # evict down to this fraction of the budget, so writes do not scan the cache every time
+
+
+class ResultCache:
+    """On-disk cache of background removal masks, addressed by content
+
+    Entries are keyed by a hash of the source file bytes, the model name and
+    the removal parameters, so renamed or copied files still hit. Writes go
+    to a temporary file that is atomically renamed into place, which keeps
+    concurrent workers (and processes) from seeing partial entries. Reads
+    refresh the entry's mtime, and once the cache grows past ``max_bytes``
+    the least recently used entries are evicted until it is back under 90%
+    of it.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir) if cache_dir else get_cache_dir() / "results"
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None  # computed lazily on first write
+
+    @staticmethod
+    def content_hash(data: bytes) -> str:
+        """SHA-256 of the source bytes, the part of the key that identifies the image"""
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def make_key(content_hash: str, model_name: str, params: Optional[dict] = None) -> str:
+        """Build the cache key for a source, by its content hash, processed with a model and parameters"""
+        digest = hashlib.sha256(content_hash.encode())
+        settings = {'model': model_name, 'params': params or {}, 'version': CACHE_VERSION}
+        digest.update(json.dumps(settings, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Image.Image]:
+        """Return the cached result for ``key``, or None on a miss"""
+        path = self._entry_path(key)
+        try:
+            with Image.open(path) as image:
+                image.load()
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return image
+
+    def put(self, key: str, image: Image.Image) -> int:
+        """Store a result and return its size on disk, evicting old entries if over budget"""
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".part")
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                image.save(handle, format='PNG', compress_level=1)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            self.writes += 1
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += size
+            over_budget = self._size > self.max_bytes
+        if over_budget:
+            self.evict(int(self.max_bytes * EVICT_TO))
+        return size
+
+    def contains(self, key: str) -> bool:
+        """Check for an entry without touching the statistics"""
+        return self._entry_path(key).exists()
+
+    def evict(self, target: Optional[int] = None):
+        """Remove least recently used entries until at most ``target`` bytes remain
+
+        ``target`` defaults to the whole budget, ``max_bytes``.
+        """
+        target = self.max_bytes if target is None else target
+        with self._lock:
+            entries = []
+            for path in self.cache_dir.glob("*/*.png"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            entries.sort()
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                self.evictions += 1
+            self._size = total
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            for path in self.cache_dir.glob("*/*.png"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            self._size = 0
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'writes': self.writes,
+                'evictions': self.evictions,
+                'size_bytes': self._size if self._size is not None else self._scan_size(),
+                'max_bytes': self.max_bytes,
+            }
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.png"
+
+    def _scan_size(self) -> int:
+        total = 0
+        for path in self.cache_dir.glob("*/*.png"):
+            try:
+                total += path.stat().st_size
+            except OSError:
+                pass
+        return total
@@ -0,0 +1,192 @@
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+DEFAULT_MEMORY_BUDGET = 1024 ** 3  # 1 GiB
+_CHANNELS = {'L': 1, 'LA': 2, 'RGB': 3, 'RGBA': 4}
+
+
+@dataclass(frozen=True)
+class ResultHandle:
+    """Reference to a result held by a ResultStore"""
+    id: int
+    mode: str
+    width: int
+    height: int
+
+    @property
+    def nbytes(self) -> int:
+        return self.width * self.height * _CHANNELS[self.mode]
+
+
+@dataclass
+class _Entry:
+    handle: ResultHandle
+    image: Optional[Image.Image] = None  # None once spilled
+    path: Optional[str] = None
+
+
+class ResultStore:
+    """Holds processed results within a memory budget, spilling to disk
+
+    The most recently stored results stay in RAM. Once their total size goes
+    over ``memory_budget`` the oldest are written to a scratch directory and
+    dropped from memory: as raw pixels that are memory-mapped back on
+    access, or, with ``compress``, as fast PNGs that trade CPU for disk
+    space. ``get`` returns the image wherever it lives, so callers only ever
+    keep a ResultHandle. Safe to use from several threads.
+    """
+
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET, scratch_dir: Optional[str] = None,
+                 compress: bool = False):
+        self.memory_budget = memory_budget
+        self.compress = compress
+        self._parent_dir = scratch_dir
+        self._scratch_dir: Optional[str] = None
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._memory_bytes = 0
+        self._spilled_bytes = 0
+        self._spilling_bytes = 0  # in memory, but already being written out
+        self._lock = threading.Lock()
+
+    def put(self, image: Image.Image) -> ResultHandle:
+        """Store ``image`` and return its handle"""
+        if image.mode not in _CHANNELS:
+            image = image.convert('RGBA')
+        handle = ResultHandle(next(self._ids), image.mode, image.width, image.height)
+        with self._lock:
+            self._entries[handle.id] = _Entry(handle, image=image)
+            self._memory_bytes += handle.nbytes
+            victims = self._pick_victims()
+        for entry, pixels in victims:
+            self._spill(entry, pixels)
+        return handle
+
+    def get(self, handle: ResultHandle) -> Image.Image:
+        """Return the image for ``handle``, loading it from disk if it was spilled"""
+        with self._lock:
+            entry = self._entries.get(handle.id)
+            if entry is None:
+                raise KeyError(f"Result {handle.id} is no longer stored")
+            if entry.image is not None:
+                self._entries.move_to_end(handle.id)
+                return entry.image
+            path = entry.path
+        return self._load(handle, path)
+
+    def release(self, handle: ResultHandle):
+        """Forget a result and delete its spill file"""
+        with self._lock:
+            entry = self._entries.pop(handle.id, None)
+            if entry is not None:
+                self._forget(entry)
+
+    def clear(self):
+        """Forget every result"""
+        with self._lock:
+            for entry in self._entries.values():
+                self._forget(entry)
+            self._entries.clear()
+
+    def close(self):
+        """Forget every result and remove the scratch directory"""
+        self.clear()
+        with self._lock:
+            if self._scratch_dir:
+                shutil.rmtree(self._scratch_dir, ignore_errors=True)
+                self._scratch_dir = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            spilled = sum(1 for entry in self._entries.values() if entry.image is None)
+            return {
+                'results': len(self._entries),
+                'spilled': spilled,
+                'memory_bytes': self._memory_bytes,
+                'spilled_bytes': self._spilled_bytes,
+                'memory_budget': self.memory_budget,
+            }
+
+    def _pick_victims(self) -> List[Tuple[_Entry, Image.Image]]:
+        """Choose least recently used in-memory entries until the rest fit the budget"""
+        victims = []
+        excess = self._memory_bytes - self._spilling_bytes - self.memory_budget
+        for entry in self._entries.values():
+            if excess <= 0:
+                break
+            # Entries already on their way to disk have a path reserved
+            if entry.image is not None and entry.path is None:
+                entry.path = self._reserve_path(entry.handle)
+                victims.append((entry, entry.image))
+                excess -= entry.handle.nbytes
+                self._spilling_bytes += entry.handle.nbytes
+        return victims
+
+    def _spill(self, entry: _Entry, image: Image.Image):
+        """Write an entry to disk outside the lock, then drop it from memory"""
+        try:
+            if self.compress:
+                image.save(entry.path, format='PNG', compress_level=1)
+            else:
+                with open(entry.path, 'wb') as handle:
+                    handle.write(image.tobytes())
+        except OSError:
+            # Keep the result in memory rather than lose it
+            with self._lock:
+                self._spilling_bytes -= entry.handle.nbytes
+                entry.path = None
+            return
+        with self._lock:
+            self._spilling_bytes -= entry.handle.nbytes
+            if self._entries.get(entry.handle.id) is not entry:
+                # Released while it was being written
+                self._remove_file(entry.path)
+                return
+            entry.image = None
+            self._memory_bytes -= entry.handle.nbytes
+            self._spilled_bytes += entry.handle.nbytes
+
+    def _load(self, handle: ResultHandle, path: str) -> Image.Image:
+        if self.compress:
+            with Image.open(path) as image:
+                image.load()
+            return image
+        channels = _CHANNELS[handle.mode]
+        shape = (handle.height, handle.width) if channels == 1 else (handle.height, handle.width, channels)
+        pixels = np.memmap(path, dtype=np.uint8, mode='r', shape=shape)
+        return Image.frombuffer(handle.mode, (handle.width, handle.height), pixels,
+                                'raw', handle.mode, 0, 1)
+
+    def _forget(self, entry: _Entry):
+        if entry.image is not None:
+            self._memory_bytes -= entry.handle.nbytes
+            entry.image = None
+            # A spill in progress deletes its own file when it finds the entry gone
+            return
+        self._spilled_bytes -= entry.handle.nbytes
+        self._remove_file(entry.path)
+
+    def _reserve_path(self, handle: ResultHandle) -> str:
+        if self._scratch_dir is None:
+            if self._parent_dir:
+                os.makedirs(self._parent_dir, exist_ok=True)
+            self._scratch_dir = tempfile.mkdtemp(prefix="tstudio-results-", dir=self._parent_dir)
+        extension = ".png" if self.compress else ".raw"
+        return os.path.join(self._scratch_dir, f"{handle.id}{extension}")
+
+    @staticmethod
+    def _remove_file(path: Optional[str]):
+        if path:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, Iterable, Iterator, List, Set
+
+
+class PriorityScheduler:
+    """Hands out paths to process, most urgent first
+
+    Paths the user selected come first, then the ones visible in the
+    gallery, then the rest in the order they were added. The selected and
+    visible sets can be replaced at any time from another thread; the next
+    path handed out already reflects them. Iterating yields each path once
+    and stops when none are left; ``requeue`` hands paths out again, for a
+    second pass over the same images.
+
+    The selected and visible paths are kept in queues that ``next`` pops
+    from the front, dropping entries handed out in the meantime, so taking
+    a path costs amortized O(1) however many are selected or visible.
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        self._pending: "OrderedDict[str, None]" = OrderedDict.fromkeys(paths)
+        self._selected: Deque[str] = deque()
+        self._visible: Deque[str] = deque()
+        # As last requested, so requeued paths regain their priority
+        self._requested_selected: List[str] = []
+        self._requested_visible: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            path = self.next()
+            if path is None:
+                return
+            yield path
+
+    def next(self):
+        """Take the most urgent pending path, or None when all were handed out"""
+        with self._lock:
+            for candidates in (self._selected, self._visible):
+                while candidates:
+                    path = candidates.popleft()
+                    if path in self._pending:
+                        del self._pending[path]
+                        return path
+            if self._pending:
+                return self._pending.popitem(last=False)[0]
+            return None
+
+    def set_selected(self, paths: Iterable[str]):
+        """Replace the paths the user has explicitly selected"""
+        with self._lock:
+            self._requested_selected = list(paths)
+            self._selected = self._still_pending(self._requested_selected)
+
+    def set_visible(self, paths: Iterable[str]):
+        """Replace the paths currently visible, in display order"""
+        with self._lock:
+            self._requested_visible = list(paths)
+            self._visible = self._still_pending(self._requested_visible)
+
+    def requeue(self, paths: Iterable[str]):
+        """Hand ``paths`` out again, after any still pending"""
+        with self._lock:
+            for path in paths:
+                self._pending.setdefault(path, None)
+            self._selected = self._still_pending(self._requested_selected)
+            self._visible = self._still_pending(self._requested_visible)
+
+    def discard(self, path: str):
+        """Stop a path from being handed out"""
+        with self._lock:
+            self._pending.pop(path, None)
+
+    def _still_pending(self, paths: Iterable[str]) -> Deque[str]:
+        seen: Set[str] = set()
+        result: Deque[str] = deque()
+        for path in paths:
+            if path in self._pending and path not in seen:
+                seen.add(path)
+                result.append(path)
+        return result
@@ -0,0 +1,125 @@
+import threading
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+import onnxruntime as ort
+import rembg
+
+DEFAULT_MODEL = "u2net"
+DEFAULT_IDLE_TIMEOUT = 300.0  # seconds
+
+SessionKey = Tuple[str, Tuple[str, ...], int, int]
+
+
+class SessionManager:
+    """Process-wide registry of rembg sessions keyed by model name and providers
+
+    Parallel workers ask for their own ``slot`` so each one owns a separate
+    ONNX session with a bounded intra-op thread count. Sessions are built
+    outside the registry lock, so loading one never delays lookups of
+    others, and different slots or models load concurrently.
+    """
+
+    def __init__(self, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._sessions: Dict[SessionKey, object] = {}
+        self._last_used: Dict[SessionKey, float] = {}
+        self._lock = threading.RLock()
+        self._creating: Dict[SessionKey, threading.Lock] = {}  # one per key, held while it loads
+        self._reaper: Optional[threading.Timer] = None
+
+    def get_session(self, model_name: str = DEFAULT_MODEL,
+                    providers: Optional[Sequence[str]] = None,
+                    intra_op_threads: int = 0, slot: int = 0):
+        """Return the session for a model, creating it on first use"""
+        key = self._make_key(model_name, providers, intra_op_threads, slot)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._touch(key)
+                return session
+            creation_lock = self._creating.setdefault(key, threading.Lock())
+        # Loading (or downloading) a model can take seconds; only callers
+        # waiting for this same session block on it
+        with creation_lock:
+            with self._lock:
+                session = self._sessions.get(key)
+            if session is None:
+                session = self._create_session(model_name, providers, intra_op_threads)
+            with self._lock:
+                session = self._sessions.setdefault(key, session)
+                self._touch(key)
+            return session
+
+    def has_session(self, model_name: str = DEFAULT_MODEL,
+                    providers: Optional[Sequence[str]] = None) -> bool:
+        """Check if any session is currently loaded for a model"""
+        prefix = self._make_key(model_name, providers)[:2]
+        with self._lock:
+            return any(key[:2] == prefix for key in self._sessions)
+
+    def unload(self, model_name: str, providers: Optional[Sequence[str]] = None):
+        """Drop every session for a model so its memory can be released"""
+        prefix = self._make_key(model_name, providers)[:2]
+        with self._lock:
+            for key in [key for key in self._sessions if key[:2] == prefix]:
+                self._sessions.pop(key, None)
+                self._last_used.pop(key, None)
+
+    def unload_all(self):
+        """Drop every loaded session"""
+        with self._lock:
+            self._sessions.clear()
+            self._last_used.clear()
+            self._cancel_reaper()
+
+    def unload_idle(self):
+        """Drop sessions that have not been used within the idle timeout"""
+        now = time.monotonic()
+        with self._lock:
+            for key, last_used in list(self._last_used.items()):
+                if now - last_used >= self.idle_timeout:
+                    self._sessions.pop(key, None)
+                    self._last_used.pop(key, None)
+            self._reaper = None
+            self._schedule_reaper()
+
+    def _create_session(self, model_name: str, providers: Optional[Sequence[str]],
+                        intra_op_threads: int):
+        """Build a new rembg session"""
+        sess_opts = ort.SessionOptions()
+        if intra_op_threads > 0:
+            sess_opts.intra_op_num_threads = intra_op_threads
+            sess_opts.inter_op_num_threads = 1
+        kwargs = {}
+        if providers:
+            kwargs['providers'] = list(providers)
+        return rembg.new_session(model_name, sess_opts=sess_opts, **kwargs)
+
+    def _touch(self, key: SessionKey):
+        """Mark a session as just used; call with the lock held"""
+        self._last_used[key] = time.monotonic()
+        self._schedule_reaper()
+
+    def _schedule_reaper(self):
+        """Arm the idle timer if sessions are loaded and no timer is pending"""
+        if self._reaper is not None or not self._sessions or self.idle_timeout <= 0:
+            return
+        self._reaper = threading.Timer(self.idle_timeout, self.unload_idle)
+        self._reaper.daemon = True
+        self._reaper.start()
+
+    def _cancel_reaper(self):
+        """Stop the idle timer"""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+
+    @staticmethod
+    def _make_key(model_name: str, providers: Optional[Sequence[str]],
+                  intra_op_threads: int = 0, slot: int = 0) -> SessionKey:
+        return model_name, tuple(providers or ()), intra_op_threads, slot
+
+
+# Shared by every worker in the process
+session_manager = SessionManager()
@@ -0,0 +1,157 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from utils.platform_utils import get_cache_dir
+
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2  # 256 MiB
+TOUCH_INTERVAL = 3600.0  # seconds; coarser LRU order saves a write per hit
+EVICT_TO = 0.9  # evict down to this fraction of the budget, so writes do not evict every time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS thumbnails (
+    path TEXT NOT NULL,
+    thumb_size INTEGER NOT NULL,
+    dpr_milli INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    file_size INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (path, thumb_size, dpr_milli)
+);
+CREATE INDEX IF NOT EXISTS thumbnails_last_used ON thumbnails (last_used);
+"""
+
+
+def source_signature(path: str) -> tuple:
+    """The (mtime in ns, size) a cached thumbnail must match"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ThumbnailCache:
+    """Persistent store of encoded source thumbnails in one SQLite file
+
+    There is one entry per path, thumbnail size and device pixel ratio, and
+    it only counts as a hit while the file's mtime and size still match.
+    Entries are replaced in place when the file changes. Once the stored
+    bytes pass ``max_bytes``, the least recently used entries are evicted.
+    Each thread gets its own connection; the database runs in WAL mode so
+    pool threads can read while another writes.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path) if path else get_cache_dir() / "thumbnails.sqlite3"
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None  # computed lazily on first write
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def get(self, path: str, signature: tuple, size: int, dpr: float = 1.0) -> Optional[bytes]:
+        """Return the encoded thumbnail if one matches the file's ``signature``"""
+        key = (path, size, round(dpr * 1000))
+        try:
+            row = self._connection().execute(
+                "SELECT mtime_ns, file_size, data, last_used FROM thumbnails "
+                "WHERE path = ? AND thumb_size = ? AND dpr_milli = ?", key).fetchone()
+        except sqlite3.Error:
+            row = None
+        if row is None or tuple(row[:2]) != tuple(signature):
+            with self._lock:
+                self.misses += 1
+            return None
+        now = time.time()
+        if now - row[3] > TOUCH_INTERVAL:
+            self._execute("UPDATE thumbnails SET last_used = ? "
+                          "WHERE path = ? AND thumb_size = ? AND dpr_milli = ?", (now, *key))
+        with self._lock:
+            self.hits += 1
+        return row[2]
+
+    def put(self, path: str, signature: tuple, size: int, dpr: float, data: bytes):
+        """Store an encoded thumbnail, replacing any older one for the same key"""
+        mtime_ns, file_size = signature
+        with self._lock:
+            if self._size is None:
+                self._size = self._stored_bytes()
+            previous = self._connection().execute(
+                "SELECT length(data) FROM thumbnails WHERE path = ? AND thumb_size = ? AND dpr_milli = ?",
+                (path, size, round(dpr * 1000))).fetchone()
+            stored = self._execute(
+                "INSERT OR REPLACE INTO thumbnails VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, size, round(dpr * 1000), mtime_ns, file_size, sqlite3.Binary(data), time.time()))
+            if not stored:
+                return
+            self._size += len(data) - (previous[0] if previous else 0)
+            if self._size > self.max_bytes:
+                self._evict(int(self.max_bytes * EVICT_TO))
+
+    def clear(self):
+        with self._lock:
+            self._execute("DELETE FROM thumbnails")
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'size_bytes': self._size if self._size is not None else self._stored_bytes(),
+            }
+
+    def close(self):
+        """Close this thread's connection"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _evict(self, target: int):
+        """Drop least recently used entries until at most ``target`` bytes remain"""
+        connection = self._connection()
+        rows = connection.execute(
+            "SELECT rowid, length(data) FROM thumbnails ORDER BY last_used").fetchall()
+        victims = []
+        for rowid, nbytes in rows:
+            if self._size <= target:
+                break
+            victims.append((rowid,))
+            self._size -= nbytes
+        with connection:
+            connection.executemany("DELETE FROM thumbnails WHERE rowid = ?", victims)
+        self.evictions += len(victims)
+
+    def _stored_bytes(self) -> int:
+        row = self._connection().execute("SELECT COALESCE(SUM(length(data)), 0) FROM thumbnails").fetchone()
+        return row[0]
+
+    def _execute(self, sql: str, parameters: tuple = ()) -> bool:
+        connection = self._connection()
+        try:
+            with connection:
+                connection.execute(sql, parameters)
+        except sqlite3.OperationalError:
+            # Another process holds the write lock; a cache write can be skipped
+            return False
+        return True
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
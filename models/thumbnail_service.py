@@ -0,0 +1,163 @@
+import io
+import os
+import threading
+from typing import Dict, Optional
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QImage
+from PIL import Image, ImageOps
+
+from utils.image_utils import pil_to_qimage
+from .thumbnail_cache import ThumbnailCache, source_signature
+
+
+def load_thumbnail(path: str, size: int) -> Image.Image:
+    """Decode ``path`` at reduced size and fit it inside ``size`` x ``size``"""
+    with Image.open(path) as image:
+        # JPEG can decode directly at 1/2, 1/4 or 1/8 scale; other formats ignore this
+        image.draft('RGB', (size * 2, size * 2))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        return image.convert('RGBA')
+
+
+def encode_thumbnail(image: Image.Image) -> bytes:
+    """Compact bytes for the thumbnail cache: JPEG when opaque, PNG otherwise"""
+    buffer = io.BytesIO()
+    if image.mode == 'RGBA' and image.getchannel('A').getextrema()[0] < 255:
+        image.save(buffer, format='PNG', compress_level=1)
+    else:
+        image.convert('RGB').save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+class _ThumbnailTask(QRunnable):
+    """Decodes one thumbnail on the service's thread pool"""
+
+    def __init__(self, service: "ThumbnailService", path: str, generation: int):
+        super().__init__()
+        self.service = service
+        self.path = path
+        self.generation = generation
+
+    def run(self):
+        if not self.service._is_wanted(self.path, self.generation):
+            return
+        try:
+            thumbnail = self.service.load(self.path)
+        except Exception as e:
+            if self.service._finish(self.path, self.generation):
+                self.service.thumbnail_failed.emit(self.path, str(e))
+            return
+        if self.service._finish(self.path, self.generation):
+            self.service.thumbnail_ready.emit(self.path, thumbnail)
+
+
+class ThumbnailService(QObject):
+    """Builds thumbnails on a background thread pool
+
+    Results come back through ``thumbnail_ready`` on the thread that owns the
+    service. Requests for paths that are cancelled, or queued before a
+    ``clear()``, are dropped without decoding.
+
+    Thumbnails are rendered at ``size`` times ``device_pixel_ratio`` pixels
+    and tagged with that ratio. With a ``ThumbnailCache`` they are looked
+    up there first and stored after decoding, so files seen in an earlier
+    session show up without touching the originals.
+    """
+
+    thumbnail_ready = Signal(str, QImage)  # path, thumbnail
+    thumbnail_failed = Signal(str, str)  # path, error message
+
+    def __init__(self, size: int, max_threads: int = 0, parent=None,
+                 cache: Optional[ThumbnailCache] = None, device_pixel_ratio: float = 1.0):
+        super().__init__(parent)
+        self.size = size
+        self.cache = cache
+        self.device_pixel_ratio = device_pixel_ratio
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads or max(2, (os.cpu_count() or 2) // 2))
+        self._pending: Dict[str, int] = {}  # path -> generation it was requested in
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def request(self, path: str):
+        """Queue a thumbnail unless one is already on its way"""
+        with self._lock:
+            if path in self._pending:
+                return
+            self._pending[path] = self._generation
+            generation = self._generation
+        self.pool.start(_ThumbnailTask(self, path, generation))
+
+    def cached(self, path: str, signature: Optional[tuple] = None) -> Optional[QImage]:
+        """The cached thumbnail if it is up to date, or None
+
+        Cheap enough (a stat, a lookup and a small decode) to call from the
+        GUI thread, so rows painted again show at once instead of waiting
+        for the pool.
+        """
+        if self.cache is None:
+            return None
+        try:
+            signature = signature or source_signature(path)
+        except OSError:
+            return None
+        data = self.cache.get(path, signature, self.size, self.device_pixel_ratio)
+        if data is None:
+            return None
+        thumbnail = QImage.fromData(data)
+        if thumbnail.isNull():
+            return None
+        thumbnail.setDevicePixelRatio(self.device_pixel_ratio)
+        return thumbnail
+
+    def load(self, path: str) -> QImage:
+        """Build one thumbnail, from the cache when it is up to date; runs on a pool thread"""
+        dpr = self.device_pixel_ratio
+        signature = None
+        if self.cache is not None:
+            signature = source_signature(path)
+            thumbnail = self.cached(path, signature)
+            if thumbnail is not None:
+                return thumbnail
+
+        image = load_thumbnail(path, round(self.size * dpr))
+        if self.cache is not None:
+            self.cache.put(path, signature, self.size, dpr, encode_thumbnail(image))
+        thumbnail = pil_to_qimage(image)
+        thumbnail.setDevicePixelRatio(dpr)
+        return thumbnail
+
+    def is_pending(self, path: str) -> bool:
+        with self._lock:
+            return path in self._pending
+
+    def cancel(self, path: str):
+        """Drop a queued request, e.g. when its row is removed"""
+        with self._lock:
+            self._pending.pop(path, None)
+
+    def clear(self):
+        """Drop every queued request"""
+        with self._lock:
+            self._pending.clear()
+            self._generation += 1
+        self.pool.clear()
+
+    def shutdown(self):
+        """Drop queued requests and wait for running ones to finish"""
+        self.clear()
+        self.pool.waitForDone()
+
+    def _is_wanted(self, path: str, generation: int) -> bool:
+        with self._lock:
+            return self._pending.get(path) == generation
+
+    def _finish(self, path: str, generation: int) -> bool:
+        """Retire a request, returning False if it was cancelled meanwhile"""
+        with self._lock:
+            if self._pending.get(path) != generation:
+                return False
+            del self._pending[path]
+            return True
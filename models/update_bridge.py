@@ -0,0 +1,98 @@
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from PySide6.QtCore import QObject, Qt, QTimer, Signal
+from PySide6.QtGui import QImage
+
+from .image_model import ResultQuality
+
+UPDATE_RATE = 30  # GUI updates per second at most
+
+
+@dataclass
+class UpdateBatch:
+    """Everything a worker reported since the previous GUI update"""
+    results: List[Tuple[str, object, QImage, ResultQuality]] = field(default_factory=list)  # latest per path
+    errors: List[Tuple[str, str]] = field(default_factory=list)  # image_path, error_message
+    metrics: List[dict] = field(default_factory=list)
+    cancelled: List[str] = field(default_factory=list)
+    progress: Optional[int] = None  # latest percentage, if it changed
+    bottleneck: Optional[str] = None  # stage limiting the run so far, sampled with new metrics
+    finished: bool = False  # the worker's all_finished; always in the last batch
+
+    def __bool__(self) -> bool:
+        return bool(self.results or self.errors or self.metrics or self.cancelled
+                    or self.progress is not None or self.finished)
+
+
+class UpdateBridge(QObject):
+    """Coalesces a BackgroundRemovalWorker's signals into rate-limited GUI updates
+
+    The worker's signals are received directly on the threads that emit
+    them and only appended to a buffer, so a burst of finished images posts
+    nothing to the GUI event loop. A timer on the bridge's thread drains the
+    buffer at most ``rate`` times a second and emits it as one
+    ``updates_ready`` batch. Within a batch only the latest result per
+    image is kept; a preview overtaken by its full result before the GUI saw
+    it is released from the worker's store. The batch carrying ``finished``
+    is always the last one.
+    """
+    updates_ready = Signal(object)  # UpdateBatch
+
+    def __init__(self, worker, rate: int = UPDATE_RATE, parent=None):
+        super().__init__(parent)
+        self.worker = worker
+        self._lock = threading.Lock()
+        self._batch = UpdateBatch()
+        self._results: Dict[str, Tuple[str, object, QImage, ResultQuality]] = {}
+        worker.image_processed.connect(self._on_result, Qt.DirectConnection)
+        worker.error_occurred.connect(self._on_error, Qt.DirectConnection)
+        worker.image_metrics.connect(self._on_metrics, Qt.DirectConnection)
+        worker.cancelled.connect(self._on_cancelled, Qt.DirectConnection)
+        worker.progress.connect(self._on_progress, Qt.DirectConnection)
+        worker.all_finished.connect(self._on_finished, Qt.DirectConnection)
+        self.timer = QTimer(self)
+        self.timer.setInterval(round(1000 / rate))
+        self.timer.timeout.connect(self.flush)
+        self.timer.start()
+
+    def flush(self):
+        """Emit whatever has been buffered as one batch"""
+        with self._lock:
+            batch, self._batch = self._batch, UpdateBatch()
+            batch.results = list(self._results.values())
+            self._results.clear()
+        if batch.metrics:
+            batch.bottleneck = self.worker.bottleneck()
+        if batch.finished:
+            self.timer.stop()
+        if batch:
+            self.updates_ready.emit(batch)
+
+    def _on_result(self, path: str, handle, thumbnail: QImage, quality: ResultQuality):
+        with self._lock:
+            superseded = self._results.pop(path, None)
+            self._results[path] = (path, handle, thumbnail, quality)
+        if superseded is not None:
+            self.worker.store.release(superseded[1])
+
+    def _on_error(self, path: str, message: str):
+        with self._lock:
+            self._batch.errors.append((path, message))
+
+    def _on_metrics(self, metrics: dict):
+        with self._lock:
+            self._batch.metrics.append(metrics)
+
+    def _on_cancelled(self, paths: list):
+        with self._lock:
+            self._batch.cancelled.extend(paths)
+
+    def _on_progress(self, value: int):
+        with self._lock:
+            self._batch.progress = value
+
+    def _on_finished(self):
+        with self._lock:
+            self._batch.finished = True
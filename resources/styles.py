@@ -116,6 +116,18 @@ QPushButton#clearButton:disabled {
     color: #adb5bd;
 }
 
+QPushButton#addFolderButton {
+    background-color: transparent;
+    color: #0d6efd;
+    border: 2px solid #0d6efd;
+    padding: 8px 14px;
+    font-size: 16px;
+}
+
+QPushButton#addFolderButton:hover {
+    background-color: rgba(13, 110, 253, 0.1);
+}
+
 /* Splitter Styles */
 QSplitter::handle {
     background-color: #e0e0e0;
@@ -172,6 +184,12 @@ QWidget#listViewContainer {
     background-color: white;
 }
 
+QListView#galleryListView {
+    border: none;
+    background-color: white;
+    outline: none;
+}
+
 /* Scrollbar Styles */
 QScrollBar:vertical {
     background: transparent;
@@ -274,6 +292,24 @@ QProgressBar::chunk {
     border-radius: 3px;
 }
 
+QLabel#throughputLabel {
+    color: #6c757d;
+    font-size: 12px;
+}
+
+QCheckBox#previewCheckBox {
+    font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif;
+    font-size: 14px;
+}
+
+QComboBox#modelCombo {
+    font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif;
+    border: 2px solid #e0e0e0;
+    border-radius: 5px;
+    padding: 6px 10px;
+    font-size: 14px;
+}
+
 /* Dark Mode Styles */
 .dark QWidget#mainWidget {
     background-color: #2d2d2d;
@@ -291,7 +327,7 @@ QProgressBar::chunk {
     background-color: #0d6efd;
 }
 
-.dark QScrollArea, .dark QWidget#listViewContainer {
+.dark QScrollArea, .dark QWidget#listViewContainer, .dark QListView#galleryListView {
     background-color: #2d2d2d;
 }
 
@@ -343,4 +379,17 @@ QProgressBar::chunk {
 .dark QProgressBar::chunk {
     background-color: #0d6efd;
 }
+
+.dark QLabel#throughputLabel {
+    color: #aaa;
+}
+
+.dark QCheckBox#previewCheckBox {
+    color: #eee;
+}
+
+.dark QComboBox#modelCombo {
+    border: 2px solid #555;
+    color: #eee;
+}
 """
\ No newline at end of file
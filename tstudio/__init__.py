@@ -0,0 +1 @@
+"""Headless entry points for TStudio (``python -m tstudio``)"""
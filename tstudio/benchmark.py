@@ -0,0 +1,209 @@
+"""Reproducible, headless throughput and latency benchmark (``python -m tstudio bench``)"""
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+from models.export_engine import ExportOptions, write_image
+from models.pipeline import StageStats
+from models.removal_engine import RemovalEngine, EngineConfig
+from utils.image_utils import apply_mask, load_cutout, pil_to_qimage
+
+BENCHMARK_VERSION = 2  # 2: images rendered in bands, generated in a child process
+BAND_ROWS = 256
+THUMBNAIL_SIZE = 128
+FORMATS = {'jpg': 'JPEG', 'png': 'PNG', 'webp': 'WEBP'}
+
+
+def make_synthetic_image(width: int, height: int, seed: int) -> Image.Image:
+    """A photo-like test image: textured gradient background and a solid subject
+
+    Rendered in float32 bands of ``BAND_ROWS`` rows, so a 4000x3000 image
+    needs a few MB of scratch space on top of its own pixels.
+    """
+    rng = np.random.default_rng(seed)
+    blue = rng.uniform(60, 200)
+    # An off-centre ellipse stands in for the foreground object
+    cx, cy = width * rng.uniform(0.35, 0.65), height * rng.uniform(0.35, 0.65)
+    rx, ry = width * rng.uniform(0.15, 0.3), height * rng.uniform(0.15, 0.3)
+    subject = rng.uniform(0, 255, 3).astype(np.float32)
+
+    pixels = np.empty((height, width, 3), np.uint8)
+    x = np.arange(width, dtype=np.float32)
+    for top in range(0, height, BAND_ROWS):
+        y = np.arange(top, min(height, top + BAND_ROWS), dtype=np.float32)[:, None]
+        band = np.empty((len(y), width, 3), np.float32)
+        band[..., 0] = x / max(1, width - 1) * 255
+        band[..., 1] = y / max(1, height - 1) * 255
+        band[..., 2] = blue
+        band += rng.standard_normal(band.shape, dtype=np.float32) * 12
+        band[((x - cx) / rx) ** 2 + ((y - cy) / ry) ** 2 <= 1] = subject
+        pixels[top:top + len(y)] = band.clip(0, 255).astype(np.uint8)
+    return Image.fromarray(pixels, 'RGB')
+
+
+def generate_dataset(directory: Path, sizes: Sequence[Tuple[int, int]], formats: Sequence[str],
+                     count: int, seed: int = 0) -> List[str]:
+    """Write ``count`` images for every size and format combination"""
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for width, height in sizes:
+        for extension in formats:
+            for number in range(count):
+                image = make_synthetic_image(width, height, seed + len(paths))
+                path = directory / f"synthetic_{width}x{height}_{number}.{extension}"
+                save_args = {'quality': 90} if extension in ('jpg', 'webp') else {}
+                image.save(path, format=FORMATS[extension], **save_args)
+                paths.append(str(path))
+    return paths
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process, or None where it is unavailable"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def git_revision() -> Optional[str]:
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parents[1], timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+class StepTimer:
+    """Per-item timings for the steps that run inside the engine's encode stage"""
+
+    def __init__(self, names: Sequence[str], workers: int):
+        self.stats: Dict[str, StageStats] = {name: StageStats(name, workers) for name in names}
+
+    @contextmanager
+    def time(self, name: str):
+        started = time.perf_counter()
+        yield
+        self.stats[name].record(started, time.perf_counter())
+
+
+def run_benchmark(paths: List[str], config: EngineConfig, output_dir: Path,
+                  options: ExportOptions) -> dict:
+    """Run ``paths`` through the engine and the GUI's post-processing steps"""
+    steps = StepTimer(('compose', 'qimage', 'thumbnail', 'save'), config.encode_workers)
+
+    def finalize(path: str, mask: Image.Image, image: Optional[Image.Image], proxied: bool):
+        with steps.time('compose'):
+            cutout = load_cutout(path, mask) if image is None or proxied else apply_mask(image, mask)
+        with steps.time('qimage'):
+            pil_to_qimage(cutout)
+        with steps.time('thumbnail'):
+            thumbnail = cutout.copy()
+            thumbnail.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.Resampling.LANCZOS)
+            pil_to_qimage(thumbnail)
+        with steps.time('save'):
+            source = Path(path)
+            target = output_dir / f"{source.stem}_{source.suffix[1:]}{options.format.extension}"
+            write_image(cutout, str(target), options)
+
+    errors = []
+    engine = RemovalEngine(config)
+    started = time.perf_counter()
+    engine.run(paths, finalize=finalize, on_result=lambda index, path, result: None,
+               on_error=lambda index, path, message: errors.append({'path': path, 'error': message}))
+    wall = time.perf_counter() - started
+
+    stages = engine.stage_stats()
+    stages.update({name: stats.snapshot() for name, stats in steps.stats.items()})
+    for snapshot in stages.values():
+        snapshot['images_per_sec'] = snapshot.pop('throughput')
+    return {
+        'images': len(paths),
+        'failed': len(errors),
+        'errors': errors,
+        'wall_seconds': wall,
+        'images_per_sec': len(paths) / wall if wall > 0 else 0.0,
+        'stages': stages,
+    }
+
+
+def parse_sizes(text: str) -> List[Tuple[int, int]]:
+    sizes = []
+    for item in text.split(','):
+        width, _, height = item.strip().lower().partition('x')
+        sizes.append((int(width), int(height)))
+    return sizes
+
+
+def run_bench(args) -> int:
+    sizes = parse_sizes(args.sizes)
+    formats = [extension.strip().lower() for extension in args.formats.split(',')]
+    unknown = [extension for extension in formats if extension not in FORMATS]
+    if unknown:
+        print(f"error: unsupported format(s): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    config = EngineConfig(num_workers=args.workers, batch_size=args.batch_size, model_name=args.model)
+    options = ExportOptions()
+    with tempfile.TemporaryDirectory(prefix="tstudio-bench-") as scratch:
+        scratch = Path(scratch)
+        generation_started = time.perf_counter()
+        # In a fresh child process, so the generator's memory never counts towards peak_rss_bytes;
+        # spawned, since forking a process with onnxruntime loaded can hang it at exit
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as generator:
+            paths = generator.submit(generate_dataset, scratch / "input", sizes, formats,
+                                     args.count, args.seed).result()
+        generation_seconds = time.perf_counter() - generation_started
+
+        # Load the model and warm up the session outside of the measurement
+        RemovalEngine(config).run(paths[:1], finalize=lambda path, mask, image, proxied: None,
+                                  on_result=lambda *_: None, on_error=lambda *_: None)
+        results = run_benchmark(paths, config, scratch / "output", options)
+
+    report = {
+        'version': BENCHMARK_VERSION,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'git_revision': git_revision(),
+        'platform': {
+            'system': platform.system(),
+            'machine': platform.machine(),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+        },
+        'config': {
+            'model': args.model,
+            'workers': args.workers,
+            'intra_op_threads': config.resolved_intra_op_threads(),
+            'batch_size': args.batch_size,
+            'sizes': [f"{width}x{height}" for width, height in sizes],
+            'formats': formats,
+            'count': args.count,
+            'seed': args.seed,
+        },
+        'generation_seconds': generation_seconds,
+        # High-water mark of the model load and the run; stages overlap, so it is not split per stage
+        'peak_rss_bytes': peak_rss_bytes(),
+        **results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+    return 1 if results['failed'] else 0
@@ -0,0 +1,239 @@
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from models.cancellation import CancellationToken
+from models.export_engine import (ExportOptions, ExportFormat, ConflictPolicy, export_filename,
+                                  write_image)
+from models.image_model import ImageModel, IMAGE_EXTENSIONS
+from models.metrics import MetricsTrace
+from models.model_registry import model_registry
+from models.removal_engine import RemovalEngine, EngineConfig, default_worker_count
+from models.result_cache import ResultCache
+from models.session_manager import DEFAULT_MODEL
+from tstudio.benchmark import run_bench
+from utils.image_utils import apply_mask, load_cutout
+
+
+def find_images(input_dir: Path, pattern: str, recursive: bool) -> List[Path]:
+    """Collect image files under ``input_dir`` matching ``pattern``"""
+    matches = input_dir.rglob(pattern) if recursive else input_dir.glob(pattern)
+    return sorted(path for path in matches
+                  if path.is_file() and path.suffix.lower() in IMAGE_EXTENSIONS)
+
+
+def output_path_for(source: Path, input_dir: Path, output_dir: Path, options: ExportOptions) -> Path:
+    """Mirror the source's sub-directory and apply the GUI's ``_nobg`` naming"""
+    relative_dir = source.parent.relative_to(input_dir)
+    return output_dir / relative_dir / export_filename(ImageModel(str(source)).get_save_filename(), options)
+
+
+def plan_targets(sources: List[Path], input_dir: Path, output_dir: Path,
+                 options: ExportOptions) -> Dict[str, Path]:
+    """Output path per source, suffixing names already claimed by an earlier source
+
+    ``a.jpg`` and ``a.png`` both map to ``a_nobg.png``; the second one gets
+    ``a_nobg_1.png``, like two such images exported from the GUI. Only names
+    claimed in this run count, not files on disk, so as long as ``sources``
+    is sorted a rerun maps every source to the same file and
+    ``--skip-existing`` stays correct.
+    """
+    targets: Dict[str, Path] = {}
+    claimed = set()
+    for source in sources:
+        target = candidate = output_path_for(source, input_dir, output_dir, options)
+        counter = 1
+        while candidate in claimed:
+            candidate = target.with_name(f"{target.stem}_{counter}{target.suffix}")
+            counter += 1
+        claimed.add(candidate)
+        targets[str(source)] = candidate
+    return targets
+
+
+class ProgressReporter:
+    """Prints progress either as JSON lines or as plain text"""
+
+    def __init__(self, as_json: bool, total: int):
+        self.as_json = as_json
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.started = time.monotonic()
+
+    def emit(self, event: str, **fields):
+        if self.as_json:
+            print(json.dumps({'event': event, **fields}), flush=True)
+        elif event == 'processed':
+            print(f"[{self.done}/{self.total}] {fields['path']} -> {fields['output']}", flush=True)
+        elif event == 'error':
+            print(f"[{self.done}/{self.total}] {fields['path']}: {fields['error']}", file=sys.stderr, flush=True)
+        elif event == 'skipped':
+            print(f"skipped {fields['count']} image(s) with existing output", flush=True)
+        elif event == 'cancelled':
+            print(f"cancelled with {fields['remaining']} image(s) left", file=sys.stderr, flush=True)
+        elif event == 'finished':
+            print(f"done: {fields['processed']} processed, {fields['failed']} failed "
+                  f"in {fields['elapsed']:.1f}s", flush=True)
+
+    def processed(self, path: str, output: str):
+        self.done += 1
+        self.emit('processed', path=path, output=output, done=self.done, total=self.total,
+                  progress=self._progress())
+
+    def error(self, path: str, message: str):
+        self.done += 1
+        self.failed += 1
+        self.emit('error', path=path, error=message, done=self.done, total=self.total,
+                  progress=self._progress())
+
+    def _progress(self) -> int:
+        return int(self.done / self.total * 100) if self.total else 100
+
+
+def run_remove(args) -> int:
+    input_dir = Path(args.input_dir).resolve()
+    output_dir = Path(args.output_dir).resolve()
+    if not input_dir.is_dir():
+        print(f"error: {input_dir} is not a directory", file=sys.stderr)
+        return 2
+
+    options = ExportOptions(
+        format=ExportFormat(args.format),
+        compress_level=args.compress_level,
+        trim=args.trim,
+        conflict=ConflictPolicy.OVERWRITE,
+    )
+    sources = find_images(input_dir, args.glob, args.recursive)
+    targets = plan_targets(sources, input_dir, output_dir, options)
+
+    skipped = 0
+    if args.skip_existing:
+        sources = [source for source in sources if not targets[str(source)].exists()]
+        skipped = len(targets) - len(sources)
+
+    reporter = ProgressReporter(args.json, len(sources))
+    reporter.emit('started', total=len(sources), input_dir=str(input_dir),
+                  output_dir=str(output_dir), model=args.model, workers=args.workers)
+    if skipped:
+        reporter.emit('skipped', count=skipped)
+
+    def save(path: str, mask, image, proxied: bool) -> str:
+        cutout = load_cutout(path, mask) if image is None or proxied else apply_mask(image, mask)
+        output = write_image(cutout, str(targets[path]), options)
+        engine.record_written(path, os.path.getsize(output))
+        return output
+
+    config = EngineConfig(
+        num_workers=args.workers,
+        batch_size=args.batch_size,
+        model_name=args.model,
+        cache=None if args.no_cache else ResultCache(),
+    )
+    engine = RemovalEngine(config)
+    # Ctrl+C stops promptly, aborting inference that is already running
+    token = CancellationToken()
+    previous_handler = signal.signal(signal.SIGINT, lambda signum, frame: token.cancel())
+    trace = MetricsTrace(args.trace) if args.trace else None
+    try:
+        engine.run(
+            [str(source) for source in sources],
+            finalize=save,
+            on_result=lambda index, path, output: reporter.processed(path, output),
+            on_error=lambda index, path, message: reporter.error(path, message),
+            token=token,
+            on_metrics=trace.write if trace is not None else lambda metrics: None,
+        )
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+        if trace is not None:
+            trace.close()
+    if token.is_cancelled():
+        reporter.emit('cancelled', remaining=len(sources) - reporter.done)
+
+    reporter.emit('finished', processed=reporter.done - reporter.failed, failed=reporter.failed,
+                  skipped=skipped, elapsed=time.monotonic() - reporter.started,
+                  stages=engine.stage_stats())
+    if token.is_cancelled():
+        return 130
+    return 1 if reporter.failed else 0
+
+
+def run_models(args) -> int:
+    models = model_registry.models(include_missing=args.all)
+    if args.warmup:
+        for info in models:
+            if info.available:
+                model_registry.warm_up(EngineConfig(num_workers=1, model_name=info.name))
+        models = [model_registry.info(info.name) for info in models]
+    if args.json:
+        print(json.dumps([{**vars(info), 'available': info.available} for info in models], indent=2))
+        return 0
+    for info in models:
+        status = "" if info.available else " (not downloaded)"
+        print(f"{info.summary()}{status}  {info.description}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m tstudio",
+                                     description="Batch background removal without a display")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    remove = commands.add_parser("remove", help="Remove backgrounds from a folder of images")
+    remove.add_argument("input_dir", help="Folder containing source images")
+    remove.add_argument("output_dir", help="Folder to write *_nobg.png files to")
+    remove.add_argument("--glob", default="*", help="File pattern to match (default: %(default)s)")
+    remove.add_argument("-r", "--recursive", action="store_true",
+                        help="Search sub-folders and mirror them in the output")
+    remove.add_argument("--workers", type=int, default=default_worker_count(),
+                        help="Parallel inference workers (default: %(default)s)")
+    remove.add_argument("--batch-size", type=int, default=1,
+                        help="Images per inference call (default: %(default)s)")
+    remove.add_argument("--model", default=DEFAULT_MODEL, help="rembg model name (default: %(default)s)")
+    remove.add_argument("--format", choices=[f.value for f in ExportFormat], default="png",
+                        help="Output format; WebP is lossless (default: %(default)s)")
+    remove.add_argument("--compress-level", type=int, choices=range(10), default=6, metavar="0-9",
+                        help="PNG compression level (default: %(default)s)")
+    remove.add_argument("--trim", action="store_true", help="Crop outputs to their visible pixels")
+    remove.add_argument("--skip-existing", action="store_true",
+                        help="Skip images whose output file already exists")
+    remove.add_argument("--no-cache", action="store_true", help="Bypass the on-disk result cache")
+    remove.add_argument("--json", action="store_true", help="Print progress as JSON lines")
+    remove.add_argument("--trace", metavar="FILE",
+                        help="Append per-image timings, sizes and outcomes to FILE as JSON lines")
+    remove.set_defaults(func=run_remove)
+
+    bench = commands.add_parser("bench", help="Measure throughput and latency on synthetic images")
+    bench.add_argument("--sizes", default="640x480,1920x1080,4000x3000",
+                       help="Comma-separated WIDTHxHEIGHT list (default: %(default)s)")
+    bench.add_argument("--formats", default="jpg,png,webp",
+                       help="Comma-separated source formats (default: %(default)s)")
+    bench.add_argument("--count", type=int, default=4,
+                       help="Images per size and format (default: %(default)s)")
+    bench.add_argument("--seed", type=int, default=0, help="Seed for the synthetic images")
+    bench.add_argument("--workers", type=int, default=default_worker_count(),
+                       help="Parallel inference workers (default: %(default)s)")
+    bench.add_argument("--batch-size", type=int, default=1,
+                       help="Images per inference call (default: %(default)s)")
+    bench.add_argument("--model", default=DEFAULT_MODEL, help="rembg model name (default: %(default)s)")
+    bench.add_argument("-o", "--output", help="Write the JSON report here instead of stdout")
+    bench.set_defaults(func=run_bench)
+
+    models = commands.add_parser("models", help="List the models available on this machine")
+    models.add_argument("--all", action="store_true", help="Include models that are not downloaded")
+    models.add_argument("--warmup", action="store_true",
+                        help="Load each downloaded model and measure its speed")
+    models.add_argument("--json", action="store_true", help="Print the list as JSON")
+    models.set_defaults(func=run_models)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,96 @@
+from typing import Optional
+
+import numpy as np
+from PIL import Image, ImageOps
+from PySide6.QtGui import QImage
+
+from .mask_refine import apply_mask_in_strips
+
+SNIFF_BYTES = 12
+
+
+def sniff_image_format(path: str) -> Optional[str]:
+    """Name the image format from a file's magic bytes: PNG, JPEG, BMP, WEBP or None
+
+    The extension is ignored. Unreadable files give None rather than raising.
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(SNIFF_BYTES)
+    except OSError:
+        return None
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'PNG'
+    if header.startswith(b'\xff\xd8\xff'):
+        return 'JPEG'
+    if header.startswith(b'BM'):
+        return 'BMP'
+    if header.startswith(b'RIFF') and header[8:12] == b'WEBP':
+        return 'WEBP'
+    return None
+
+
+def pil_to_qimage(image: Image.Image) -> QImage:
+    """Wrap a PIL image's pixels in a QImage without an encode/decode round-trip
+
+    The pixels are copied out of PIL exactly once. The QImage references that
+    buffer directly and PySide keeps it alive for as long as the image data
+    exists, including implicitly shared copies sent across threads. Treat the
+    result as read-only.
+    """
+    if image.mode != 'RGBA':
+        image = image.convert('RGBA')
+    width, height = image.size
+    data = image.tobytes('raw', 'RGBA')
+    return QImage(data, width, height, width * 4, QImage.Format_RGBA8888)
+
+
+def array_to_qimage(array: np.ndarray) -> QImage:
+    """Wrap an ``HxWx4`` RGBA or ``HxW`` grayscale uint8 array in a QImage
+
+    The array is shared, not copied, when it is already C-contiguous; the
+    QImage holds a reference to it so the memory outlives the caller's array.
+    """
+    if array.dtype != np.uint8:
+        raise ValueError(f"Expected a uint8 array, got {array.dtype}")
+    array = np.ascontiguousarray(array)
+    if array.ndim == 3 and array.shape[2] == 4:
+        image_format = QImage.Format_RGBA8888
+    elif array.ndim == 2:
+        image_format = QImage.Format_Grayscale8
+    else:
+        raise ValueError(f"Unsupported array shape {array.shape}")
+    height, width = array.shape[:2]
+    return QImage(array, width, height, array.strides[0], image_format)
+
+
+def apply_mask(image: Image.Image, mask: Image.Image) -> Image.Image:
+    """Compose an RGBA cutout from a source image and its ``L`` alpha mask
+
+    Matches rembg's default cutout: pixels are blended onto transparent
+    black, so fully transparent pixels carry no colour. A mask predicted on
+    a reduced-size proxy is upscaled with edge-aware refinement.
+    """
+    if image.size != mask.size:
+        width, height = image.size
+        same_aspect = abs(mask.width * height - mask.height * width) <= max(width, height)
+        if not (same_aspect and mask.width < width):
+            raise ValueError(f"Mask size {mask.size} does not match image size {image.size}; "
+                             "the source may have changed since it was processed")
+        return apply_mask_in_strips(image, mask)
+    return Image.composite(image.convert('RGBA'), Image.new('RGBA', image.size, 0), mask)
+
+
+def load_cutout(path: str, mask: Image.Image) -> Image.Image:
+    """Decode the source at ``path`` and apply its alpha mask"""
+    with Image.open(path) as image:
+        # In place, so an upright image is not copied
+        ImageOps.exif_transpose(image, in_place=True)
+        return apply_mask(image, mask)
+
+
+def qimage_to_pil(image: QImage) -> Image.Image:
+    """Copy a QImage's pixels into an RGBA PIL image"""
+    image = image.convertToFormat(QImage.Format_RGBA8888)
+    size = (image.width(), image.height())
+    return Image.frombytes('RGBA', size, image.constBits(), 'raw', 'RGBA', image.bytesPerLine())
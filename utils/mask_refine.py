@@ -0,0 +1,83 @@
+from typing import Tuple
+
+import numpy as np
+from PIL import Image
+
+STRIP_HEIGHT = 128
+GUIDED_RADIUS = 2  # in mask pixels
+GUIDED_EPS = 1e-4
+
+
+def _box_filter(array: np.ndarray, radius: int) -> np.ndarray:
+    """Mean over a ``(2r+1)`` square window, shrinking the window at the borders"""
+    def window(length: int):
+        lower = np.maximum(np.arange(length) - radius, 0)
+        upper = np.minimum(np.arange(length) + radius + 1, length)
+        return lower, upper
+
+    def window_sum(values: np.ndarray, axis: int) -> np.ndarray:
+        # Prefix sums in float64 so long rows do not lose precision
+        sums = np.cumsum(values, axis=axis, dtype=np.float64)
+        sums = np.insert(sums, 0, 0, axis=axis)
+        lower, upper = window(values.shape[axis])
+        return np.take(sums, upper, axis=axis) - np.take(sums, lower, axis=axis)
+
+    row_lower, row_upper = window(array.shape[0])
+    col_lower, col_upper = window(array.shape[1])
+    counts = np.outer(row_upper - row_lower, col_upper - col_lower)
+    return (window_sum(window_sum(array, 0), 1) / counts).astype(np.float32)
+
+
+def guided_coefficients(guide: np.ndarray, source: np.ndarray, radius: int,
+                        eps: float = GUIDED_EPS) -> Tuple[np.ndarray, np.ndarray]:
+    """Smoothed linear coefficients ``a, b`` so that ``source ~ a * guide + b``
+
+    Both arrays are float32 in [0, 1]. This is the grey-guide filter from
+    He et al., "Guided Image Filtering"; ``a`` and ``b`` vary slowly and can
+    be fitted at low resolution, then applied to a sharper guide.
+    """
+    mean_guide = _box_filter(guide, radius)
+    mean_source = _box_filter(source, radius)
+    covariance = _box_filter(guide * source, radius) - mean_guide * mean_source
+    variance = _box_filter(guide * guide, radius) - mean_guide * mean_guide
+    a = covariance / (variance + eps)
+    b = mean_source - a * mean_guide
+    return _box_filter(a, radius), _box_filter(b, radius)
+
+
+def apply_mask_in_strips(image: Image.Image, mask: Image.Image,
+                         strip_height: int = STRIP_HEIGHT, radius: int = GUIDED_RADIUS,
+                         eps: float = GUIDED_EPS) -> Image.Image:
+    """Upscale a reduced-size ``mask`` to ``image`` and compose the cutout
+
+    Uses guided upsampling: the guided filter's linear coefficients are
+    fitted at the mask's resolution against a downscaled copy of the image,
+    then upscaled and applied to the full-resolution pixels, so the mask
+    picks up edges the model never saw. The image is walked in horizontal
+    strips and each strip is written premultiplied into the output, so the
+    working memory grows with the strip height rather than the image area.
+    """
+    width, height = image.size
+    small_guide = np.asarray(image.resize(mask.size, Image.Resampling.BOX).convert('L'),
+                             dtype=np.float32) / 255
+    small_mask = np.asarray(mask, dtype=np.float32) / 255
+    a, b = guided_coefficients(small_guide, small_mask, radius, eps)
+    a, b = Image.fromarray(a, 'F'), Image.fromarray(b, 'F')
+    scale_y = mask.height / height
+
+    output = np.empty((height, width, 4), dtype=np.uint8)
+    for top in range(0, height, strip_height):
+        bottom = min(height, top + strip_height)
+        box = (0, top * scale_y, mask.width, bottom * scale_y)
+        size = (width, bottom - top)
+        strip_a = np.asarray(a.resize(size, Image.Resampling.BILINEAR, box=box))
+        strip_b = np.asarray(b.resize(size, Image.Resampling.BILINEAR, box=box))
+
+        pixels = image.crop((0, top, width, bottom)).convert('RGBA')
+        guide = np.asarray(pixels.convert('L'), dtype=np.float32) / 255
+        alpha = np.clip(strip_a * guide + strip_b, 0, 1)
+        strip = np.asarray(pixels, dtype=np.float32)
+        strip *= alpha[:, :, None]
+        output[top:bottom] = np.rint(strip, out=strip)
+
+    return Image.fromarray(output, 'RGBA')
@@ -1,3 +1,4 @@
+import os
 import platform
 from pathlib import Path
 
@@ -21,4 +22,14 @@ if IS_MACOS:
         HAS_NSVIEW = False
 else:
     HAS_NSVIEW = False
-    
\ No newline at end of file
+
+
+def get_cache_dir() -> Path:
+    """Per-user cache directory for the application"""
+    if IS_MACOS:
+        base = Path.home() / "Library" / "Caches"
+    elif IS_WINDOWS:
+        base = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local"))
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return base / "tstudio"
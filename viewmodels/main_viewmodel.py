@@ -1,8 +1,9 @@
 from PySide6.QtCore import QObject, Signal
 from PySide6.QtWidgets import QFileDialog
 from typing import List, Dict
-import os
-from models import ImageModel, BackgroundRemovalModel
+from functools import partial
+from models import ImageModel, BackgroundRemovalModel, ExportOptions, ExportWorker, ResultStore
+from utils.image_utils import load_cutout, sniff_image_format
 
 class MainViewModel(QObject):
     """ViewModel for the main application logic"""
@@ -21,6 +22,8 @@ class MainViewModel(QObject):
         super().__init__()
         self.image_models: Dict[str, ImageModel] = {}
         self.bg_removal_model = BackgroundRemovalModel()
+        self.export_worker = None
+        self.result_stores: Dict[str, ResultStore] = {}  # path -> store of the worker that made its result
         
     def add_images_from_paths(self, paths: List[str]):
         """Add images from file paths"""
@@ -64,12 +67,15 @@ class MainViewModel(QObject):
     def clear_images(self):
         """Clear all images"""
         self.bg_removal_model.stop_processing()
+        for path, store in self.result_stores.items():
+            store.release(self.image_models[path].result)
+        self.result_stores.clear()
         self.image_models.clear()
         self.images_cleared.emit()
         self._update_ui_state()
     
-    def save_images(self, parent=None):
-        """Save all processed images"""
+    def save_images(self, parent=None, options: ExportOptions = None):
+        """Save all processed images on a background export worker"""
         processed_models = [model for model in self.image_models.values() if model.is_processed]
         
         if not processed_models:
@@ -82,12 +88,19 @@ class MainViewModel(QObject):
         if not save_dir:
             return False
         
-        for model in processed_models:
-            save_path = os.path.join(save_dir, model.get_save_filename())
-            model.processed_image.save(save_path, "PNG")
+        items = [(model.path, model.get_save_filename(),
+                  partial(self._load_cutout, model.path, model.result))
+                 for model in processed_models]
+        self.export_worker = ExportWorker(items, save_dir, options)
+        self.export_worker.progress.connect(self.progress_updated.emit)
+        self.export_worker.error_occurred.connect(self.error_occurred.emit)
+        self.export_worker.start()
         
         return True
     
+    def _load_cutout(self, path: str, result):
+        return load_cutout(path, self.result_stores[path].get(result))
+    
     def get_image_count(self) -> int:
         """Get total number of images"""
         return len(self.image_models)
@@ -96,11 +109,16 @@ class MainViewModel(QObject):
         """Get number of processed images"""
         return sum(1 for model in self.image_models.values() if model.is_processed)
     
-    def _on_image_processed(self, path: str, processed_image):
+    def _on_image_processed(self, path: str, result, thumbnail, quality):
         """Handle when an image is processed"""
         if path in self.image_models:
-            self.image_models[path].set_processed_image(processed_image)
-            self.image_processed.emit(path, processed_image)
+            previous = self.image_models[path].result
+            if previous is not None:
+                self.result_stores[path].release(previous)
+            # The handle is only valid in the store of the worker that produced it
+            self.result_stores[path] = self.sender().store
+            self.image_models[path].set_result(result, thumbnail, quality)
+            self.image_processed.emit(path, thumbnail)
     
     def _on_processing_finished(self):
         """Handle when all processing is finished"""
@@ -122,5 +140,5 @@ class MainViewModel(QObject):
         self.ui_state_changed.emit(state)
     
     def _is_valid_image(self, path: str) -> bool:
-        """Check if file is a valid image"""
-        return path.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.webp'))
+        """Check if file is a valid image, by its contents rather than its extension"""
+        return sniff_image_format(path) is not None
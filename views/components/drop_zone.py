@@ -1,11 +1,17 @@
+import os
 from PySide6.QtWidgets import QLabel, QFileDialog, QVBoxLayout, QFrame
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QDragEnterEvent, QDropEvent, QPixmap
 from utils.platform_utils import RESOURCES_PATH
 
 class ImageDropZone(QFrame):
-    """Drag and drop zone for images"""
+    """Drag and drop zone for images and folders
+
+    Dropped files are passed on as they are and recognized later by their
+    contents; dropped folders are reported separately, to be scanned.
+    """
     image_dropped = Signal(list)
+    folder_dropped = Signal(list)
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -86,13 +92,20 @@ class ImageDropZone(QFrame):
     def dropEvent(self, event: QDropEvent):
         """Handle drop event"""
         file_paths = []
+        folder_paths = []
         for url in event.mimeData().urls():
-            file_path = url.toLocalFile()
-            if file_path.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.webp')):
-                file_paths.append(file_path)
+            path = url.toLocalFile()
+            if not path:
+                continue
+            if os.path.isdir(path):
+                folder_paths.append(path)
+            else:
+                file_paths.append(path)
                 
         if file_paths:
             self.image_dropped.emit(file_paths)
+        if folder_paths:
+            self.folder_dropped.emit(folder_paths)
             
         self.setStyleSheet("""
             ImageDropZone {
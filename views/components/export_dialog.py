@@ -0,0 +1,68 @@
+from PySide6.QtWidgets import (QDialog, QFormLayout, QComboBox, QSpinBox, QCheckBox,
+                               QDialogButtonBox, QVBoxLayout)
+
+from models.export_engine import ExportOptions, ExportFormat, ConflictPolicy
+
+
+class ExportDialog(QDialog):
+    """Dialog for choosing export format, compression and conflict handling"""
+
+    def __init__(self, options: ExportOptions | None = None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Export Options")
+        self.setObjectName("exportDialog")
+        self._setup_ui()
+        self.set_options(options or ExportOptions())
+
+    def _setup_ui(self):
+        """Setup the UI components"""
+        self.layout = QVBoxLayout(self)
+        form = QFormLayout()
+
+        self.format_combo = QComboBox()
+        self.format_combo.addItem("PNG", ExportFormat.PNG)
+        self.format_combo.addItem("WebP (lossless)", ExportFormat.WEBP)
+        self.format_combo.currentIndexChanged.connect(self._update_enabled)
+        form.addRow("Format", self.format_combo)
+
+        self.compression_spin = QSpinBox()
+        self.compression_spin.setRange(0, 9)
+        self.compression_spin.setToolTip("0 is fastest, 9 gives the smallest files")
+        form.addRow("PNG compression", self.compression_spin)
+
+        self.trim_check = QCheckBox("Trim to visible pixels")
+        form.addRow("", self.trim_check)
+
+        self.conflict_combo = QComboBox()
+        self.conflict_combo.addItem("Add a number suffix", ConflictPolicy.SUFFIX)
+        self.conflict_combo.addItem("Overwrite", ConflictPolicy.OVERWRITE)
+        self.conflict_combo.addItem("Skip", ConflictPolicy.SKIP)
+        form.addRow("If the file exists", self.conflict_combo)
+
+        self.layout.addLayout(form)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        self.layout.addWidget(buttons)
+
+    def set_options(self, options: ExportOptions):
+        """Show the given options in the controls"""
+        self.format_combo.setCurrentIndex(self.format_combo.findData(options.format))
+        self.compression_spin.setValue(options.compress_level)
+        self.trim_check.setChecked(options.trim)
+        self.conflict_combo.setCurrentIndex(self.conflict_combo.findData(options.conflict))
+        self._update_enabled()
+
+    def options(self) -> ExportOptions:
+        """Get the options chosen in the dialog"""
+        return ExportOptions(
+            format=self.format_combo.currentData(),
+            compress_level=self.compression_spin.value(),
+            trim=self.trim_check.isChecked(),
+            conflict=self.conflict_combo.currentData(),
+        )
+
+    def _update_enabled(self):
+        """Compression level only applies to PNG"""
+        self.compression_spin.setEnabled(self.format_combo.currentData() == ExportFormat.PNG)
@@ -1,7 +1,8 @@
 from PySide6.QtWidgets import QFrame, QHBoxLayout, QLabel
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QPixmap, QImage, QPainter, QPen, QBrush, QColor
+from PySide6.QtGui import QPixmap, QImage, QPainter
 from models import ImageModel
+from .preview_renderer import draw_chess_board, is_dark_palette
 
 class ImageThumbnail(QFrame):
     """Thumbnail widget for displaying images with chess board background"""
@@ -37,8 +38,8 @@ class ImageThumbnail(QFrame):
     
     def _load_image(self):
         """Load and display the image"""
-        if self.image_model.is_processed and self.image_model.processed_image:
-            pixmap = QPixmap.fromImage(self.image_model.processed_image)
+        if self.image_model.is_processed and self.image_model.thumbnail:
+            pixmap = QPixmap.fromImage(self.image_model.thumbnail)
         else:
             pixmap = QPixmap(self.image_model.path)
         
@@ -46,9 +47,9 @@ class ImageThumbnail(QFrame):
         pixmap = pixmap.scaled(70, 70, Qt.KeepAspectRatio, Qt.SmoothTransformation)
         self.image_label.setPixmap(pixmap)
     
-    def update_with_processed_image(self, processed_image: QImage):
-        """Update thumbnail with processed image"""
-        self.image_model.set_processed_image(processed_image)
+    def update_with_result(self, result, thumbnail: QImage):
+        """Update thumbnail with a processed result"""
+        self.image_model.set_result(result, thumbnail)
         self._load_image()
 
 
@@ -62,32 +63,17 @@ class ChessBoardLabel(QLabel):
     def paintEvent(self, event):
         """Override paint event to draw chess board background"""
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
         
         # Draw chess board background
         self._draw_chess_board(painter)
+        painter.end()
         
         # Call paintEvent of QLabel to draw pixmap
         super().paintEvent(event)
     
     def _draw_chess_board(self, painter):
         """Draw chess board pattern"""
-        width = self.width()
-        height = self.height()
-        
-        # Colors for chess board
-        light_color = QColor(255, 255, 255, 100)  # White transparent
-        dark_color = QColor(128, 128, 128, 100)   # Gray transparent
-        
-        # Draw each square
-        for row in range(0, height, self.square_size):
-            for col in range(0, width, self.square_size):
-                # Determine color based on position (chess board pattern)
-                is_light = (row // self.square_size + col // self.square_size) % 2 == 0
-                color = light_color if is_light else dark_color
-                
-                # Draw square
-                painter.fillRect(col, row, self.square_size, self.square_size, color)
+        draw_chess_board(painter, self.rect(), self.square_size, is_dark_palette(self.palette()))
     
     def set_square_size(self, size):
         """Set the size of chess board squares"""
@@ -0,0 +1,84 @@
+from PySide6.QtWidgets import QStyledItemDelegate, QStyleOptionViewItem, QStyle
+from PySide6.QtCore import Qt, QModelIndex, QRect, QRectF, QSize
+from PySide6.QtGui import QPainter, QColor, QPen, QFont
+
+from models import ResultQuality
+from ..gallery_model import GalleryModel
+from .preview_renderer import draw_chess_board, is_dark_palette, preview_renderer
+
+ROW_MARGIN = 4
+ROW_PADDING = 16
+IMAGE_BOX = 80
+NAME_SPACING = 10
+
+
+class ThumbnailDelegate(QStyledItemDelegate):
+    """Paints a gallery row the way ImageThumbnail lays it out
+
+    A rounded card holding a chess board box with the thumbnail on top and
+    the filename next to it. Only rows inside the viewport are ever painted,
+    and the chess board with the thumbnail composited on it comes from the
+    shared ``preview_renderer``, so a row seen before is a single blit.
+    Provisional cutouts from the preview pass carry a small "Preview" tag.
+    """
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        height = IMAGE_BOX + 2 * (ROW_PADDING + ROW_MARGIN)
+        return QSize(option.rect.width(), height)
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        dark = is_dark_palette(option.palette)
+
+        # Card background
+        card = QRectF(option.rect.adjusted(ROW_MARGIN, ROW_MARGIN, -ROW_MARGIN, -ROW_MARGIN))
+        if option.state & QStyle.State_Selected:
+            painter.setPen(QPen(QColor("#0d6efd"), 1))
+        else:
+            painter.setPen(QPen(QColor("#444") if dark else QColor("#e0e0e0"), 1))
+        painter.setBrush(QColor("#333") if dark else QColor("white"))
+        painter.drawRoundedRect(card.adjusted(0.5, 0.5, -0.5, -0.5), 8, 8)
+
+        # Chess board box with the thumbnail centered on it
+        image_rect = QRect(int(card.left()) + ROW_PADDING,
+                           int(card.center().y()) - IMAGE_BOX // 2,
+                           IMAGE_BOX, IMAGE_BOX)
+        pixmap = index.data(Qt.DecorationRole)
+        if pixmap.isNull():
+            draw_chess_board(painter, image_rect, dark=dark)
+            if index.data(GalleryModel.LoadingRole):
+                # Thumbnail still loading
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(QColor(128, 128, 128, 60))
+                painter.drawRoundedRect(QRectF(image_rect.adjusted(5, 5, -5, -5)), 4, 4)
+        else:
+            dpr = painter.device().devicePixelRatioF()
+            painter.drawPixmap(image_rect, preview_renderer.preview(pixmap, IMAGE_BOX, dark, dpr))
+            if index.data(GalleryModel.QualityRole) == ResultQuality.PREVIEW:
+                self._draw_preview_tag(painter, image_rect, option.font)
+
+        # Filename
+        font = QFont(option.font)
+        font.setPixelSize(16)
+        font.setWeight(QFont.Medium)
+        painter.setFont(font)
+        painter.setPen(QColor("#eee") if dark else QColor("#333"))
+        text_rect = QRect(image_rect.right() + 1 + NAME_SPACING, int(card.top()),
+                          int(card.right()) - image_rect.right() - NAME_SPACING - ROW_PADDING,
+                          int(card.height()))
+        painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignVCenter | Qt.TextWrapAnywhere,
+                         index.data(Qt.DisplayRole) or "")
+        painter.restore()
+
+    def _draw_preview_tag(self, painter: QPainter, image_rect: QRect, base_font: QFont):
+        font = QFont(base_font)
+        font.setPixelSize(10)
+        font.setWeight(QFont.Medium)
+        painter.setFont(font)
+        tag = QRectF(image_rect.left() + 3, image_rect.bottom() - 16, 44, 14)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(0, 0, 0, 150))
+        painter.drawRoundedRect(tag, 4, 4)
+        painter.setPen(QColor("white"))
+        painter.drawText(tag, Qt.AlignCenter, "Preview")
@@ -0,0 +1,176 @@
+import sqlite3
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex
+from PySide6.QtGui import QGuiApplication, QImage, QPixmap
+
+from models import ImageModel, ResultQuality
+from models.thumbnail_cache import ThumbnailCache
+from models.thumbnail_service import ThumbnailService
+
+THUMBNAIL_SIZE = 70
+MAX_CACHED_THUMBNAILS = 512
+
+
+class GalleryModel(QAbstractListModel):
+    """List model exposing images to the gallery view
+
+    Thumbnails are requested only when a delegate asks for a row's decoration,
+    i.e. when the row is painted. Source thumbnails are decoded by a
+    ThumbnailService off the GUI thread; until one arrives the row's
+    decoration is a null pixmap, ``LoadingRole`` is True and the delegate
+    paints a placeholder. Finished
+    thumbnails live in a bounded LRU cache so memory stays flat however many
+    images are loaded. Source thumbnails also persist in a ``ThumbnailCache``
+    across sessions, rendered for the screen's device pixel ratio.
+    """
+
+    ImageModelRole = Qt.UserRole + 1
+    PathRole = Qt.UserRole + 2
+    ProcessedRole = Qt.UserRole + 3
+    LoadingRole = Qt.UserRole + 4
+    QualityRole = Qt.UserRole + 5
+
+    def __init__(self, parent=None, thumbnail_cache: Optional[ThumbnailCache] = None):
+        super().__init__(parent)
+        self._images: List[ImageModel] = []
+        self._rows: Dict[str, int] = {}
+        self._thumbnails: "OrderedDict[str, QPixmap]" = OrderedDict()
+        if thumbnail_cache is None:
+            try:
+                thumbnail_cache = ThumbnailCache()
+            except (OSError, sqlite3.Error):
+                thumbnail_cache = None  # read-only or broken cache dir; decode every time
+        application = QGuiApplication.instance()
+        self.device_pixel_ratio = application.devicePixelRatio() if application else 1.0
+        self.thumbnail_service = ThumbnailService(THUMBNAIL_SIZE, parent=self, cache=thumbnail_cache,
+                                                  device_pixel_ratio=self.device_pixel_ratio)
+        self.thumbnail_service.thumbnail_ready.connect(self._on_thumbnail_ready)
+        self.thumbnail_service.thumbnail_failed.connect(self._on_thumbnail_failed)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._images)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._images):
+            return None
+        image_model = self._images[index.row()]
+        if role == Qt.DisplayRole:
+            return image_model.filename
+        if role == Qt.DecorationRole:
+            return self._thumbnail(image_model)
+        if role == Qt.ToolTipRole:
+            return image_model.path
+        if role == self.ImageModelRole:
+            return image_model
+        if role == self.PathRole:
+            return image_model.path
+        if role == self.ProcessedRole:
+            return image_model.is_processed
+        if role == self.LoadingRole:
+            return self.thumbnail_service.is_pending(image_model.path)
+        if role == self.QualityRole:
+            return image_model.quality
+        return None
+
+    def add_images(self, image_models: List[ImageModel]):
+        """Append images, skipping paths already in the model"""
+        new_models = [model for model in image_models if model.path not in self._rows]
+        if not new_models:
+            return
+        first = len(self._images)
+        self.beginInsertRows(QModelIndex(), first, first + len(new_models) - 1)
+        for offset, model in enumerate(new_models):
+            self._rows[model.path] = first + offset
+            self._images.append(model)
+        self.endInsertRows()
+
+    @property
+    def thumbnail_side(self) -> int:
+        """Pixel size thumbnails are shown at on this screen"""
+        return round(THUMBNAIL_SIZE * self.device_pixel_ratio)
+
+    def update_image(self, path: str, result, thumbnail: QImage,
+                     quality: ResultQuality = ResultQuality.FULL):
+        """Mark a row as processed and refresh its thumbnail"""
+        self.update_images([(path, result, thumbnail, quality)])
+
+    def update_images(self, results: List[Tuple[str, object, QImage, ResultQuality]]):
+        """Mark rows as processed and refresh them with a single dataChanged"""
+        rows = []
+        for path, result, thumbnail, quality in results:
+            row = self._rows.get(path)
+            if row is None:
+                continue
+            image_model = self._images[row]
+            if image_model.result is not result:
+                image_model.set_result(result, thumbnail, quality)
+            self._thumbnails.pop(path, None)
+            rows.append(row)
+        if rows:
+            self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)),
+                                  [Qt.DecorationRole, self.ProcessedRole, self.QualityRole])
+
+    def clear(self):
+        """Remove all rows"""
+        self.thumbnail_service.clear()
+        self.beginResetModel()
+        self._images.clear()
+        self._rows.clear()
+        self._thumbnails.clear()
+        self.endResetModel()
+
+    def row_for_path(self, path: str) -> Optional[int]:
+        return self._rows.get(path)
+
+    def _thumbnail(self, image_model: ImageModel) -> QPixmap:
+        """Return the row's thumbnail, or a null pixmap while it is being generated"""
+        pixmap = self._thumbnails.get(image_model.path)
+        if pixmap is not None:
+            self._thumbnails.move_to_end(image_model.path)
+            return pixmap
+
+        if image_model.is_processed and image_model.thumbnail:
+            side = self.thumbnail_side
+            pixmap = QPixmap.fromImage(image_model.thumbnail)
+            if max(pixmap.width(), pixmap.height()) > side:
+                pixmap = pixmap.scaled(side, side, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            pixmap.setDevicePixelRatio(self.device_pixel_ratio)
+            self._cache_thumbnail(image_model.path, pixmap)
+            return pixmap
+
+        thumbnail = self.thumbnail_service.cached(image_model.path)
+        if thumbnail is not None:
+            pixmap = QPixmap.fromImage(thumbnail)
+            self._cache_thumbnail(image_model.path, pixmap)
+            return pixmap
+
+        self.thumbnail_service.request(image_model.path)
+        return QPixmap()
+
+    def _on_thumbnail_ready(self, path: str, thumbnail: QImage):
+        """Store a decoded source thumbnail and repaint its row"""
+        row = self._rows.get(path)
+        if row is None or self._images[row].is_processed:
+            return
+        self._cache_thumbnail(path, QPixmap.fromImage(thumbnail))
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole, self.LoadingRole])
+
+    def _on_thumbnail_failed(self, path: str, error_message: str):
+        """Cache an empty thumbnail for unreadable files so they are not retried"""
+        row = self._rows.get(path)
+        if row is None:
+            return
+        self._cache_thumbnail(path, QPixmap())
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole, self.LoadingRole])
+
+    def _cache_thumbnail(self, path: str, pixmap: QPixmap):
+        self._thumbnails[path] = pixmap
+        self._thumbnails.move_to_end(path)
+        while len(self._thumbnails) > MAX_CACHED_THUMBNAILS:
+            self._thumbnails.popitem(last=False)
@@ -1,24 +1,40 @@
-from PySide6.QtWidgets import (QWidget, QVBoxLayout, QScrollArea, QLabel, QSizePolicy)
-from PySide6.QtCore import Qt
-from typing import Dict, Optional
-from models import ImageModel
-from .components import ImageThumbnail
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QListView, QLabel, QSizePolicy,
+                               QAbstractItemView, QMenu)
+from PySide6.QtCore import Qt, Signal, QTimer, QPoint
+from typing import List, Optional
+from models import ImageModel, ImageState, ResultQuality
+from .components.thumbnail_delegate import ThumbnailDelegate
+from .gallery_model import GalleryModel
 
 class ListView(QWidget):
-    """List view for displaying images vertically"""
-    
+    """List view for displaying images vertically
+
+    Backed by a GalleryModel and painted by a ThumbnailDelegate, so only the
+    rows in the viewport cost anything to draw.
+    """
+
+    cancel_requested = Signal(list)  # paths of queued images to drop from the run
+    visible_paths_changed = Signal(list)  # paths of the rows on screen, top to bottom
+    selected_paths_changed = Signal(list)
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.thumbnails: Dict[str, ImageThumbnail] = {}
+        self.model = GalleryModel(self)
         self.empty_label: Optional[QLabel] = None
+        # Scrolling fires many times a second; report the visible rows once it settles
+        self._visible_timer = QTimer(self)
+        self._visible_timer.setSingleShot(True)
+        self._visible_timer.setInterval(50)
+        self._visible_timer.timeout.connect(
+            lambda: self.visible_paths_changed.emit(self.visible_paths()))
         self._setup_ui()
-        
+
     def _setup_ui(self):
         """Setup list view UI"""
         self.layout = QVBoxLayout()
         self.layout.setSpacing(8)
         self.layout.setContentsMargins(0, 0, 0, 0)
-        
+
         # Create empty state label
         self.empty_label = QLabel("No images added yet\nDrop images to get started")
         self.empty_label.setAlignment(Qt.AlignCenter)
@@ -27,47 +43,106 @@ class ListView(QWidget):
         self.empty_label.setMinimumSize(200, 200)  # Set a minimum size to ensure visibility
         self.empty_label.setWordWrap(True)
         self.empty_label.setVisible(True)
-        
-        self.container_widget = QWidget()
-        self.container_widget.setObjectName("listViewContainer")
-        self.container_layout = QVBoxLayout(self.container_widget)
-        self.container_layout.setSpacing(8)
-        self.container_layout.setAlignment(Qt.AlignTop)
-        
-        # Add empty label to container
-        self.container_layout.addWidget(self.empty_label)
-        
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setWidget(self.container_widget)
-        self.scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        self.scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        
-        self.layout.addWidget(self.scroll_area)
+
+        self.list_view = QListView()
+        self.list_view.setObjectName("galleryListView")
+        self.list_view.setModel(self.model)
+        self.list_view.setItemDelegate(ThumbnailDelegate(self.list_view))
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setSpacing(2)
+        self.list_view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.list_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.list_view.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.list_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.list_view.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.list_view.customContextMenuRequested.connect(self._show_context_menu)
+        self.list_view.verticalScrollBar().valueChanged.connect(self._visible_timer.start)
+        self.list_view.selectionModel().selectionChanged.connect(
+            lambda: self.selected_paths_changed.emit(self.selected_paths()))
+        self.model.rowsInserted.connect(self._visible_timer.start)
+        self.model.modelReset.connect(self._visible_timer.start)
+        self.list_view.setVisible(False)
+
+        self.layout.addWidget(self.empty_label)
+        self.layout.addWidget(self.list_view)
         self.setLayout(self.layout)
-        
+
     def add_image(self, image_model: str | ImageModel):
         """Add image to list view"""
-        if isinstance(image_model, str):
-            image_model = ImageModel(image_model)
-        thumbnail = ImageThumbnail(image_model)
-        self.container_layout.addWidget(thumbnail)
-        self.thumbnails[image_model.path] = thumbnail
-        
-        # Hide empty state if this is the first image
-        if len(self.thumbnails) == 1 and self.empty_label:
-            self.empty_label.setVisible(False)
-            
-    def update_image(self, path: str, processed_image):
+        self.add_images([image_model])
+
+    def add_images(self, image_models: List[str | ImageModel]):
+        """Add several images to the list view at once"""
+        image_models = [ImageModel(model) if isinstance(model, str) else model
+                        for model in image_models]
+        self.model.add_images(image_models)
+        self._update_empty_state()
+
+    def update_image(self, path: str, result, thumbnail, quality=ResultQuality.FULL):
         """Update an image with processed version"""
-        if path in self.thumbnails:
-            self.thumbnails[path].update_with_processed_image(processed_image)
-            
+        self.model.update_image(path, result, thumbnail, quality)
+
+    def update_images(self, results: list):
+        """Update several images at once; ``results`` holds (path, result, thumbnail, quality)"""
+        self.model.update_images(results)
+
     def clear(self):
         """Clear all images"""
-        for thumbnail in self.thumbnails.values():
-            thumbnail.deleteLater()
-        self.thumbnails.clear()
-        # Show empty state when all images are cleared
-        if self.empty_label:
-            self.empty_label.setVisible(True)
\ No newline at end of file
+        self.model.clear()
+        self._update_empty_state()
+
+    def visible_paths(self) -> List[str]:
+        """Paths of the rows currently on screen, top to bottom"""
+        rows = self.model.rowCount()
+        if not rows or not self.list_view.isVisible():
+            return []
+        viewport = self.list_view.viewport().rect()
+        first = self._row_near(viewport.top(), 1)
+        last = self._row_near(viewport.bottom(), -1)
+        first = 0 if first is None else first
+        last = rows - 1 if last is None else last
+        return [self.model.index(row).data(GalleryModel.PathRole) for row in range(first, last + 1)]
+
+    def selected_paths(self) -> List[str]:
+        """Paths of the selected rows"""
+        return [index.data(GalleryModel.PathRole)
+                for index in self.list_view.selectionModel().selectedIndexes()]
+
+    def _row_near(self, y: int, step: int) -> Optional[int]:
+        """Row at height ``y``, looking a few pixels further when it hits the spacing"""
+        x = self.list_view.viewport().rect().center().x()
+        for offset in range(0, 8 * step, step):
+            index = self.list_view.indexAt(QPoint(x, y + offset))
+            if index.isValid():
+                return index.row()
+        return None
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._visible_timer.start()
+
+    def shutdown(self):
+        """Stop background thumbnail work before the window goes away"""
+        self._visible_timer.stop()
+        self.model.thumbnail_service.shutdown()
+
+    def _show_context_menu(self, position):
+        """Offer to cancel the selected images that are still being processed"""
+        paths = []
+        for index in self.list_view.selectionModel().selectedIndexes():
+            image_model = index.data(GalleryModel.ImageModelRole)
+            if image_model.state == ImageState.IN_FLIGHT:
+                paths.append(image_model.path)
+        if not paths:
+            return
+        menu = QMenu(self)
+        label = "Cancel Processing" if len(paths) == 1 else f"Cancel Processing ({len(paths)} images)"
+        action = menu.addAction(label)
+        if menu.exec(self.list_view.viewport().mapToGlobal(position)) is action:
+            self.cancel_requested.emit(paths)
+
+    def _update_empty_state(self):
+        """Show the empty state label only when there are no images"""
+        has_images = self.model.rowCount() > 0
+        self.empty_label.setVisible(not has_images)
+        self.list_view.setVisible(has_images)
@@ -1,4 +1,6 @@
 import os
+from dataclasses import replace
+from functools import partial
 
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                               QSplitter, QApplication, QFileDialog)
@@ -10,7 +12,13 @@ from .gallery_views import ListView
 from .components.gallery_header import GalleryHeader
 from .components.mac_vibrancy_widget import MacVibrancyWidget
 from .components.custom_titlebar import MacOSTitleBar
-from models import BackgroundRemovalWorker
+from .components.export_dialog import ExportDialog
+from models import (BackgroundRemovalWorker, EngineConfig, ExportOptions, ExportWorker, FolderScanner,
+                    ImageRegistry, ModelWarmupWorker, PREVIEW_MODEL, ResultCache, ResultStore,
+                    ThroughputMeter, UpdateBridge, model_registry, session_manager)
+from models.image_model import ResultQuality
+from models.session_manager import DEFAULT_MODEL
+from utils.image_utils import load_cutout
 from utils.platform_utils import IS_MACOS, HAS_NSVIEW
 from resources.styles import STYLESHEET
 
@@ -28,9 +36,24 @@ class MainWindow(QMainWindow):
         self._init_ui()
 
         # Initialize state
-        self.image_paths = []
-        self.processed_images = {}
+        self.image_models = ImageRegistry(self)
+        self.processed_images = {}  # path -> ResultHandle; pixels live in result_store
         self.worker_thread = None 
+        self.update_bridge = None  # batches the current worker's output for the GUI
+        self.retired_workers = []  # stopped workers that are still winding down
+        self.close_pending = False
+        self.export_worker = None
+        self.warmup_workers = []  # model warm-ups still running
+        self.scanners = []  # folder scans still adding images
+        self.retired_scanners = []  # stopped scans that are still winding down
+        self.model_name = os.environ.get("TSTUDIO_MODEL", DEFAULT_MODEL)
+        self.export_options = ExportOptions()
+        self.previews_not_exported = 0  # images the last export left out
+        self.result_cache = ResultCache()
+        self.result_store = ResultStore()
+        self.throughput = ThroughputMeter()
+        self.previewed = set()  # paths with a preview result from the current run
+        self.trace_path = os.environ.get("TSTUDIO_TRACE")  # per-image metrics as JSON lines
         self.is_maximized = False
         
         # Connect signals
@@ -38,6 +61,10 @@ class MainWindow(QMainWindow):
         
         # Apply theme
         self._apply_theme()
+        
+        # Load the model in the background so the first image starts quickly
+        self.sidebar.set_models(model_registry.models(), self.model_name)
+        self._warm_up_model()
 
         self.move(460, 240)
     
@@ -119,8 +146,16 @@ class MainWindow(QMainWindow):
         """Connect signals between components"""
         # Connect sidebar signals
         self.sidebar.images_dropped.connect(self.add_images)
+        self.sidebar.folders_dropped.connect(self.scan_folders)
+        self.image_models.images_added.connect(self.images_added)
         self.sidebar.process_clicked.connect(self.process_images)
+        self.sidebar.reprocess_clicked.connect(self.reprocess_all_images)
         self.sidebar.clear_clicked.connect(self.clear_images)
+        self.sidebar.model_changed.connect(self.select_model)
+        self.sidebar.preview_toggled.connect(self.set_preview_enabled)
+        self.list_view.cancel_requested.connect(self.cancel_images)
+        self.list_view.visible_paths_changed.connect(self.update_visible_priority)
+        self.list_view.selected_paths_changed.connect(self.update_selected_priority)
 
         # Connect title bar signals
         self.title_bar.closeClicked.connect(self.close)
@@ -156,62 +191,267 @@ class MainWindow(QMainWindow):
         self.central_widget.update()
     
     def add_images(self, paths):
-        for path in paths:
-            if path not in self.image_paths:
-                self.image_paths.append(path)
-                self.list_view.add_image(path)
-                
-        self.sidebar.process_button.setEnabled(len(self.image_paths) > 0)
-        self.sidebar.clear_button.setVisible(len(self.image_paths) > 0)
-        self.sidebar.clear_button.setEnabled(len(self.image_paths) > 0)
-        
-        # Update gallery title
-        count = len(self.image_paths)
-        self.gallery_header.set_title(f"Image Gallery ({count} {'image' if count == 1 else 'images'})")
-        
-    def process_images(self):
-        if not self.image_paths:
+        self.image_models.add_many(paths)
+        
+    def images_added(self, image_models):
+        """Show a batch of new images; called once per add_many"""
+        self.list_view.add_images(image_models)
+        
+        self.sidebar.process_button.setEnabled(len(self.image_models) > 0)
+        self.sidebar.clear_button.setVisible(len(self.image_models) > 0)
+        self.sidebar.clear_button.setEnabled(len(self.image_models) > 0)
+        
+        self._update_gallery_title()
+        
+    def _update_gallery_title(self):
+        count = len(self.image_models)
+        title = f"Image Gallery ({count} {'image' if count == 1 else 'images'}"
+        if self.scanners:
+            title += ", scanning…"
+        self.gallery_header.set_title(title + ")")
+        
+    def scan_folders(self, folders):
+        """Add every image under ``folders``, streaming them in as they are found"""
+        scanner = FolderScanner(folders)
+        scanner.images_found.connect(self.add_scanned_images)
+        scanner.scan_finished.connect(self.scan_finished)
+        scanner.finished.connect(self._scanner_done)
+        self.scanners.append(scanner)
+        self._update_gallery_title()
+        scanner.start()
+        
+    def add_scanned_images(self, paths):
+        if self.sender() in self.scanners:
+            self.image_models.add_many(paths, sniffed=True)
+            
+    def scan_finished(self, found, skipped):
+        scanner = self.sender()
+        if scanner in self.scanners:
+            self.scanners.remove(scanner)
+            self.retired_scanners.append(scanner)
+            self._update_gallery_title()
+            
+    def _scanner_done(self):
+        scanner = self.sender()
+        for scanners in (self.scanners, self.retired_scanners):
+            if scanner in scanners:
+                scanners.remove(scanner)
+        if self.close_pending:
+            self.close()
+            
+    def _stop_scanners(self):
+        for scanner in self.scanners:
+            scanner.stop()
+        self.retired_scanners.extend(self.scanners)
+        self.scanners.clear()
+        
+    def process_images(self, reprocess_all: bool = False):
+        """Process images that have no up-to-date result, or all of them"""
+        if not self.image_models:
             return
+        if self.update_bridge is not None:
+            return  # a run is going, or its last results are still on their way
+            
+        pending = [model for model in self.image_models.values()
+                   if reprocess_all or model.needs_processing()]
+        if not pending:
+            return
+        for model in pending:
+            model.mark_in_flight()
             
         # Disable UI during processing
         self.sidebar.process_button.setEnabled(False)
+        self.sidebar.reprocess_button.setEnabled(False)
         self.sidebar.progress_bar.setValue(0)
         self.sidebar.progress_bar.setVisible(True)
         
         # Create and start worker thread
-        self.worker_thread = BackgroundRemovalWorker(self.image_paths)
-        self.worker_thread.progress.connect(self.update_progress)
-        self.worker_thread.image_processed.connect(self.update_image)
-        self.worker_thread.all_finished.connect(self.processing_finished)
+        self.worker_thread = BackgroundRemovalWorker(
+            pending, config=self._engine_config(), store=self.result_store,
+            thumbnail_size=self.list_view.model.thumbnail_side, trace_path=self.trace_path)
+        self.throughput.start(len(pending) * self.worker_thread.passes)
+        self.previewed.clear()
+        self.update_bridge = UpdateBridge(self.worker_thread, parent=self)
+        self.update_bridge.updates_ready.connect(self.apply_updates)
+        # Start with what the user is looking at
+        self.worker_thread.scheduler.set_selected(self.list_view.selected_paths())
+        self.worker_thread.scheduler.set_visible(self.list_view.visible_paths())
         self.worker_thread.start()
         
+    def _engine_config(self) -> EngineConfig:
+        # A preview pass only helps if its model is faster than the chosen one
+        preview = self.sidebar.preview_checkbox.isChecked() and self.model_name != PREVIEW_MODEL
+        return EngineConfig(model_name=self.model_name, cache=self.result_cache,
+                            preview_model=PREVIEW_MODEL if preview else None)
+        
+    def set_preview_enabled(self, enabled):
+        """Turn the quick preview pass on or off for the next run"""
+        if enabled:
+            self._warm_up_model()
+        
+    def select_model(self, model_name):
+        """Use another model for the next run and warm it up now"""
+        if model_name == self.model_name:
+            return
+        self.model_name = model_name
+        self._warm_up_model()
+        
+    def _warm_up_model(self):
+        """Warm up the chosen models, but only those already downloaded
+
+        Loading a missing model downloads it first, which could take minutes
+        and would hold up closing the window; it is fetched on first use.
+        """
+        config = self._engine_config()
+        if config.preview_model and not model_registry.info(config.preview_model).available:
+            config = replace(config, preview_model=None)
+        if not model_registry.info(config.model_name).available:
+            if not config.preview_model:
+                return
+            config = config.preview()
+        worker = ModelWarmupWorker(config)
+        worker.model_ready.connect(self.model_ready)
+        worker.finished.connect(self._warmup_finished)
+        self.warmup_workers.append(worker)
+        worker.start()
+        
+    def model_ready(self, model_name, seconds_per_image):
+        # Show the measured speed in the model picker
+        self.sidebar.set_models(model_registry.models(), self.model_name)
+        
+    def _warmup_finished(self):
+        worker = self.sender()
+        if worker in self.warmup_workers:
+            self.warmup_workers.remove(worker)
+        if self.close_pending:
+            self.close()
+        
+    def reprocess_all_images(self):
+        self.process_images(reprocess_all=True)
+        
+    def apply_updates(self, batch):
+        """Apply everything the worker reported since the last tick, in one go"""
+        bridge = self.sender()
+        if batch.finished:
+            bridge.deleteLater()
+        if bridge is not self.update_bridge:
+            # From a worker that was stopped; its results are no longer wanted
+            for _, result, _, _ in batch.results:
+                self.result_store.release(result)
+            return
+        if batch.results:
+            self.update_images(batch.results)
+        for image_path, error_message in batch.errors:
+            self.image_failed(image_path, error_message)
+        if batch.metrics:
+            self.update_throughput(batch.metrics, batch.bottleneck)
+        if batch.cancelled:
+            self.images_cancelled(batch.cancelled)
+        if batch.progress is not None:
+            self.update_progress(batch.progress)
+        if batch.finished:
+            self.update_bridge = None
+            self.processing_finished()
+        
     def update_progress(self, value):
         self.sidebar.progress_bar.setValue(value)
         
-    def update_image(self, image_path, processed_image):
-        self.processed_images[image_path] = processed_image
-        self.list_view.update_image(image_path, processed_image)
+    def update_throughput(self, metrics, bottleneck=None):
+        for image_metrics in metrics:
+            if image_metrics['content_hash']:
+                self.image_models.set_content_hash(image_metrics['path'], image_metrics['content_hash'])
+            self.throughput.add(image_metrics['finished_at'])
+        self.sidebar.set_throughput(self.throughput.images_per_second(), self.throughput.eta_seconds(),
+                                    bottleneck)
+        
+    def update_images(self, results):
+        updated = []
+        for image_path, result, thumbnail, quality in results:
+            if image_path not in self.image_models:
+                self.result_store.release(result)
+                continue
+            previous = self.processed_images.get(image_path)
+            if previous is not None:
+                self.result_store.release(previous)
+            self.image_models[image_path].set_result(result, thumbnail, quality)
+            if quality == ResultQuality.PREVIEW:
+                self.previewed.add(image_path)
+            self.processed_images[image_path] = result
+            updated.append((image_path, result, thumbnail, quality))
+        self.list_view.update_images(updated)
+        
+    def image_failed(self, image_path, error_message):
+        if self.worker_thread.passes > 1 and image_path not in self.previewed:
+            # Failed in the preview pass, so it is not run again at full quality
+            self.throughput.drop()
+        if image_path in self.image_models:
+            self.image_models[image_path].mark_failed(error_message)
+            
+    def update_visible_priority(self, paths):
+        """Move images scrolled into view to the front of the queue"""
+        if self.worker_thread and self.worker_thread.isRunning():
+            self.worker_thread.scheduler.set_visible(paths)
+            
+    def update_selected_priority(self, paths):
+        """Move selected images to the very front of the queue"""
+        if self.worker_thread and self.worker_thread.isRunning():
+            self.worker_thread.scheduler.set_selected(paths)
+                
+    def cancel_images(self, paths):
+        """Drop queued images from the current run without stopping it"""
+        if self.worker_thread and self.worker_thread.isRunning():
+            for path in paths:
+                self.worker_thread.cancel_image(path)
+                
+    def images_cancelled(self, paths):
+        for path in paths:
+            if path in self.image_models:
+                self.image_models[path].reset_in_flight()
         
     def processing_finished(self):
-        self.sidebar.progress_bar.setVisible(False)
+        # Images left in flight were interrupted by a stop
+        for model in self.image_models.values():
+            model.reset_in_flight()
+        self.sidebar.show_progress(False)
         self.sidebar.process_button.setEnabled(True)
+        self.sidebar.reprocess_button.setEnabled(True)
+        self.sidebar.reprocess_button.setVisible(len(self.processed_images) > 0)
         self.title_bar.save_button.setVisible(len(self.processed_images) > 0)
         self.title_bar.save_button.setEnabled(len(self.processed_images) > 0)
         
+    def _retire_worker(self):
+        """Stop the current worker without blocking the event loop"""
+        worker = self.worker_thread
+        self.worker_thread = None
+        self.update_bridge = None  # batches still to come from it are dropped
+        if worker is None or not worker.isRunning():
+            return
+        worker.stop()
+        self.retired_workers.append(worker)
+        worker.finished.connect(self._worker_retired)
+        
+    def _worker_retired(self):
+        worker = self.sender()
+        if worker in self.retired_workers:
+            self.retired_workers.remove(worker)
+        if self.close_pending:
+            self.close()
+        
     def clear_images(self):
-        if self.worker_thread and self.worker_thread.isRunning():
-            self.worker_thread.stop()
-            self.worker_thread.wait()
+        self._retire_worker()
+        self._stop_scanners()
             
-        self.image_paths.clear()
+        self.image_models.clear()
         self.processed_images.clear()
+        self.result_store.clear()
         self.list_view.clear()
         
         self.sidebar.process_button.setEnabled(False)
+        self.sidebar.reprocess_button.setVisible(False)
         self.sidebar.clear_button.setVisible(False)
         self.title_bar.save_button.setVisible(False)
         self.sidebar.clear_button.setEnabled(False)
-        self.sidebar.progress_bar.setVisible(False)
+        self.sidebar.show_progress(False)
         
         # Reset gallery title
         self.gallery_header.set_title("Image Gallery")
@@ -219,6 +459,31 @@ class MainWindow(QMainWindow):
     def save_images(self):
         if not self.processed_images:
             return
+        if self.export_worker and self.export_worker.isRunning():
+            return
+            
+        # Cutouts are composed from the source and stored mask on the export threads.
+        # A preview mask is only a low-resolution stand-in, never a final output;
+        # an image keeps one if its full pass failed, was cancelled or is still running
+        items = []
+        self.previews_not_exported = 0
+        for image_path, result in self.processed_images.items():
+            image_model = self.image_models.get(image_path)
+            if image_model is None:
+                continue
+            if image_model.quality != ResultQuality.FULL:
+                self.previews_not_exported += 1
+                continue
+            items.append((image_path, image_model.get_save_filename(),
+                          partial(self._load_cutout, image_path, result)))
+        if not items:
+            self.sidebar.show_status("Nothing to export yet: only preview results are available")
+            return
+        
+        dialog = ExportDialog(self.export_options, self)
+        if not dialog.exec():
+            return
+        self.export_options = dialog.options()
             
         save_dir = QFileDialog.getExistingDirectory(
             self, "Select Save Directory", "", QFileDialog.ShowDirsOnly
@@ -227,18 +492,44 @@ class MainWindow(QMainWindow):
         if not save_dir:
             return
             
-        for image_path, processed_image in self.processed_images.items():
-            filename = os.path.basename(image_path)
-            name, _ = os.path.splitext(filename)
-            save_path = os.path.join(save_dir, f"{name}_nobg.png")
-            
-            # Save the image
-            processed_image.save(save_path, "PNG")
+        # Write on a background pool so the window stays responsive
+        self.export_worker = ExportWorker(items, save_dir, self.export_options)
+        self.export_worker.progress.connect(self.update_progress)
+        self.export_worker.all_finished.connect(self.export_finished)
+        self.title_bar.save_button.setEnabled(False)
+        self.sidebar.progress_bar.setValue(0)
+        self.sidebar.progress_bar.setVisible(True)
+        self.export_worker.start()
+        
+    def _load_cutout(self, image_path, result):
+        return load_cutout(image_path, self.result_store.get(result))
+        
+    def export_finished(self):
+        if not (self.worker_thread and self.worker_thread.isRunning()):
+            self.sidebar.show_progress(False)
+            if self.previews_not_exported:
+                self.sidebar.show_status(f"{self.previews_not_exported} image(s) not exported: "
+                                         "only a preview result is available")
+        self.title_bar.save_button.setEnabled(len(self.processed_images) > 0)
         
     def closeEvent(self, event):
-        if self.worker_thread and self.worker_thread.isRunning():
-            self.worker_thread.stop()
-            self.worker_thread.wait()
+        # Ask background work to stop and close once it has, instead of blocking here
+        self._retire_worker()
+        self._stop_scanners()
+        if self.export_worker and self.export_worker.isRunning():
+            if not self.close_pending:
+                self.export_worker.stop()
+                self.export_worker.finished.connect(self.close)
+        # A warm-up cannot be interrupted while a model loads, so wait for it too
+        if (self.retired_workers or self.warmup_workers or self.retired_scanners
+                or (self.export_worker and self.export_worker.isRunning())):
+            self.close_pending = True
+            self.setEnabled(False)
+            event.ignore()
+            return
+        self.list_view.shutdown()
+        self.result_store.close()
+        session_manager.unload_all()
         event.accept()
         
     def resizeEvent(self, event):
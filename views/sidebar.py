@@ -1,6 +1,6 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QPushButton, 
-                              QProgressBar)
-from PySide6.QtCore import Signal
+                              QProgressBar, QComboBox, QCheckBox, QFileDialog)
+from PySide6.QtCore import Qt, Signal
 from .components import ImageDropZone
 
 class Sidebar(QWidget):
@@ -8,8 +8,12 @@ class Sidebar(QWidget):
     
     # Signals
     images_dropped = Signal(list)
+    folders_dropped = Signal(list)  # folders to scan for images
     process_clicked = Signal()
+    reprocess_clicked = Signal()
     clear_clicked = Signal()
+    model_changed = Signal(str)
+    preview_toggled = Signal(bool)
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -35,16 +39,43 @@ class Sidebar(QWidget):
         self.drop_zone = ImageDropZone()
         self.layout.addWidget(self.drop_zone)
         
+        # Folder picker, for whole shoots
+        self.add_folder_button = QPushButton("Add Folder…")
+        self.add_folder_button.setObjectName("addFolderButton")
+        self.layout.addWidget(self.add_folder_button)
+        
+        # Model picker
+        self.model_combo = QComboBox()
+        self.model_combo.setObjectName("modelCombo")
+        self.layout.addWidget(self.model_combo)
+        
+        # Quick low-resolution pass before the full-quality one
+        self.preview_checkbox = QCheckBox("Show quick previews first")
+        self.preview_checkbox.setObjectName("previewCheckBox")
+        self.preview_checkbox.setChecked(True)
+        self.layout.addWidget(self.preview_checkbox)
+        
         # Process button
         self.process_button = QPushButton("Remove Background")
         self.process_button.setEnabled(False)
         self.layout.addWidget(self.process_button)
         
+        # Reprocess button, shown once something has been processed
+        self.reprocess_button = QPushButton("Reprocess All")
+        self.reprocess_button.setVisible(False)
+        self.layout.addWidget(self.reprocess_button)
+        
         # Progress bar
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
         self.layout.addWidget(self.progress_bar)
         
+        # Throughput and time remaining, under the progress bar
+        self.throughput_label = QLabel()
+        self.throughput_label.setObjectName("throughputLabel")
+        self.throughput_label.setVisible(False)
+        self.layout.addWidget(self.throughput_label)
+        
         # Bottom buttons
         self._setup_bottom_buttons()
         
@@ -71,8 +102,14 @@ class Sidebar(QWidget):
     def _connect_signals(self):
         """Connect internal signals"""
         self.drop_zone.image_dropped.connect(self.images_dropped.emit)
+        self.drop_zone.folder_dropped.connect(self.folders_dropped.emit)
+        self.add_folder_button.clicked.connect(self._choose_folder)
         self.process_button.clicked.connect(self.process_clicked.emit)
+        self.reprocess_button.clicked.connect(self.reprocess_clicked.emit)
         self.clear_button.clicked.connect(self.clear_clicked.emit)
+        self.preview_checkbox.toggled.connect(self.preview_toggled.emit)
+        self.model_combo.activated.connect(
+            lambda index: self.model_changed.emit(self.model_combo.itemData(index)))
     
     # def update_ui_state(self, state: dict):
     #     """Update UI state based on viewmodel state"""
@@ -82,6 +119,26 @@ class Sidebar(QWidget):
     #     self.clear_button.setEnabled(has_images)
     #     self.clear_button.setVisible(has_images)
     
+    def _choose_folder(self):
+        """Ask for a folder and scan it, sub-folders included"""
+        folder = QFileDialog.getExistingDirectory(self, "Add Folder")
+        if folder:
+            self.folders_dropped.emit([folder])
+    
+    def set_models(self, models: list, selected: str):
+        """Fill the model picker from ``ModelInfo`` entries and select one"""
+        self.model_combo.blockSignals(True)
+        self.model_combo.clear()
+        for info in models:
+            self.model_combo.addItem(info.summary(), info.name)
+            self.model_combo.setItemData(self.model_combo.count() - 1, info.description, Qt.ToolTipRole)
+        index = self.model_combo.findData(selected)
+        if index < 0:
+            self.model_combo.addItem(selected, selected)
+            index = self.model_combo.count() - 1
+        self.model_combo.setCurrentIndex(index)
+        self.model_combo.blockSignals(False)
+    
     def set_progress(self, value: int):
         """Set progress bar value"""
         self.progress_bar.setValue(value)
@@ -89,6 +146,26 @@ class Sidebar(QWidget):
     def show_progress(self, show: bool):
         """Show or hide progress bar"""
         self.progress_bar.setVisible(show)
+        if not show:
+            self.throughput_label.clear()
+            self.throughput_label.setVisible(False)
+    
+    def show_status(self, text: str):
+        """Show a one-line note under the progress bar until the next run"""
+        self.throughput_label.setText(text)
+        self.throughput_label.setVisible(True)
+    
+    def set_throughput(self, images_per_second: float, eta_seconds: float | None,
+                       bottleneck: str | None = None):
+        """Show the current processing rate, estimated time remaining and limiting stage"""
+        text = f"{images_per_second:.1f} images/s"
+        if eta_seconds is not None:
+            minutes, seconds = divmod(int(round(eta_seconds)), 60)
+            text += f" · {minutes}:{seconds:02d} remaining"
+        if bottleneck:
+            text += f" · limited by {bottleneck}"
+        self.throughput_label.setText(text)
+        self.throughput_label.setVisible(True)
     
     def set_processing_state(self, is_processing: bool):
         """Update UI for processing state"""